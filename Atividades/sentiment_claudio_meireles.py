@@ -24,6 +24,211 @@ import seaborn as sns
 
 nltk.download('stopwords')
 nltk.download('punkt_tab')
+"""# 0. Funções de inferência em lotes e cache persistente
+
+Definidas antes de baixar o dataset e o modelo do Hugging Face, para poderem
+ser verificadas localmente, sem rede.
+"""
+
+import time
+import torch
+import sqlite3
+import hashlib
+
+def analyze_sentiment_batched(texts, batch_size=32, max_length=512, model=None, tokenizer=None):
+    # Sem model/tokenizer, usa o pipeline da seção 2
+    model = sentiment_analyzer.model if model is None else model
+    tokenizer = sentiment_analyzer.tokenizer if tokenizer is None else tokenizer
+
+    # Tokenizar todos os textos uma única vez, truncando por número de tokens
+    encodings = tokenizer(list(texts), truncation=True, max_length=max_length)
+    lengths = [len(ids) for ids in encodings['input_ids']]
+
+    # Ordenar por tamanho: cada lote reúne textos de tamanho parecido e o
+    # padding fica mínimo
+    order = np.argsort(lengths, kind='stable')
+
+    results = [None] * len(lengths)
+    model.eval()
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            batch_indices = order[start:start + batch_size]
+            batch = tokenizer.pad(
+                {key: [encodings[key][i] for i in batch_indices] for key in encodings.keys()},
+                return_tensors='pt'
+            )
+            probabilities = torch.softmax(model(**batch).logits, dim=-1)
+            scores, label_ids = probabilities.max(dim=-1)
+
+            # Devolver cada resultado na posição original do texto
+            for i, label_id, score in zip(batch_indices, label_ids.tolist(), scores.tolist()):
+                results[i] = {'label': model.config.id2label[label_id], 'score': score}
+
+    return results
+
+class SentimentCache:
+    """
+    Guarda em um arquivo SQLite o resultado do transformer para cada par
+    (modelo + truncamento, hash do texto), para que novas execuções do
+    notebook só rodem o modelo nos reviews ainda não vistos
+    """
+
+    def __init__(self, model_name, path='sentiment_cache.sqlite', max_length=512):
+        self.path = path
+        self.model_name = model_name
+        self.max_length = max_length
+        # Textos longos são truncados em max_length tokens: outro limite muda
+        # o resultado, então faz parte da chave
+        self.model_key = f'{model_name}|truncation=True|max_length={max_length}'
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'model TEXT, text_hash TEXT, label TEXT, score REAL, '
+            'PRIMARY KEY (model, text_hash)) WITHOUT ROWID'
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, texts, chunk_size=500):
+        # Busca em blocos (o SQLite limita o número de parâmetros por consulta)
+        hashes = [self.text_hash(text) for text in texts]
+        found = {}
+        for start in range(0, len(hashes), chunk_size):
+            chunk = hashes[start:start + chunk_size]
+            rows = self.connection.execute(
+                f'SELECT text_hash, label, score FROM results '
+                f'WHERE model = ? AND text_hash IN ({",".join("?" * len(chunk))})',
+                [self.model_key, *chunk]
+            )
+            for text_hash, label, score in rows:
+                found[text_hash] = {'label': label, 'score': score}
+
+        results = [found.get(text_hash) for text_hash in hashes]
+        hits = sum(result is not None for result in results)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(self, texts, results):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                [(self.model_key, self.text_hash(text), result['label'], result['score'])
+                 for text, result in zip(texts, results)]
+            )
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def analyze(self, texts, analyzer=analyze_sentiment_batched, **kwargs):
+        """
+        Resultados para todos os textos, rodando o analisador (em lotes) só
+        nos textos que não estão no cache
+        """
+        texts = [str(text) for text in texts]
+        results = self.get_many(texts)
+
+        # Textos repetidos são classificados uma única vez
+        missing = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+        if missing:
+            computed = dict(zip(missing, analyzer(missing, max_length=self.max_length, **kwargs)))
+            self.put_many(missing, [computed[text] for text in missing])
+            results = [result if result is not None else computed[text]
+                       for text, result in zip(texts, results)]
+        return results
+
+    def __len__(self):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM results WHERE model = ?', [self.model_key]
+        ).fetchone()[0]
+
+"""## Verificação do cache com um modelo minúsculo construído localmente (sem rede)
+
+Roda apenas quando o notebook é executado como script/notebook principal.
+"""
+
+import tempfile
+import os
+from transformers import (DistilBertConfig, DistilBertForSequenceClassification,
+                          DistilBertTokenizerFast)
+
+def check_sentiment_cache():
+    # Vocabulário mínimo e modelo com pesos aleatórios: os rótulos não importam,
+    # só que o caminho em lotes e o cache produzam exatamente os mesmos resultados
+    with tempfile.TemporaryDirectory() as tiny_dir:
+        tiny_words = ['good', 'bad', 'movie', 'great', 'boring', 'plot', 'acting', 'the', 'was']
+        with open(os.path.join(tiny_dir, 'vocab.txt'), 'w') as f:
+            f.write('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + tiny_words))
+        tiny_tokenizer = DistilBertTokenizerFast.from_pretrained(tiny_dir)  # diretório local, sem rede
+
+        torch.manual_seed(0)
+        tiny_model = DistilBertForSequenceClassification(DistilBertConfig(
+            vocab_size=tiny_tokenizer.vocab_size, dim=16, n_layers=1, n_heads=2, hidden_dim=32,
+            max_position_embeddings=64, id2label={0: 'NEGATIVE', 1: 'POSITIVE'},
+            label2id={'NEGATIVE': 0, 'POSITIVE': 1}
+        ))
+
+        seen = []
+        def tiny_analyzer(texts, **kwargs):
+            # Caminho real em lotes, registrando quais textos chegaram ao modelo
+            seen.extend(texts)
+            return analyze_sentiment_batched(texts, model=tiny_model, tokenizer=tiny_tokenizer,
+                                             **kwargs)
+
+        def expected(texts):
+            return analyze_sentiment_batched(texts, model=tiny_model, tokenizer=tiny_tokenizer,
+                                             max_length=64, batch_size=2)
+
+        def same_results(a, b):
+            return all(x['label'] == y['label'] and abs(x['score'] - y['score']) < 1e-4
+                       for x, y in zip(a, b)) and len(a) == len(b)
+
+        tiny_texts = ['good movie', 'the plot was boring', 'great acting', 'bad movie',
+                      'good movie', 'the movie was great and the acting was good']
+        tiny_path = os.path.join(tiny_dir, 'cache.sqlite')
+        caches = []
+        def open_cache(model_name='tiny-local', max_length=64):
+            caches.append(SentimentCache(model_name, tiny_path, max_length=max_length))
+            return caches[-1]
+
+        try:
+            # 1ª execução: tudo é falta; cada texto distinto vai uma única vez ao modelo
+            tiny_cache = open_cache()
+            first = tiny_cache.analyze(tiny_texts, analyzer=tiny_analyzer, batch_size=2)
+            assert same_results(first, expected(tiny_texts))
+            assert sorted(seen) == sorted(set(tiny_texts))
+            assert (tiny_cache.hits, tiny_cache.misses) == (0, len(tiny_texts))
+
+            # Textos novos misturados aos antigos: só os novos rodam, e a ordem é mantida
+            seen.clear()
+            mixed = ['bad movie', 'boring acting', 'good movie', 'the plot was great']
+            assert same_results(tiny_cache.analyze(mixed, analyzer=tiny_analyzer, batch_size=2),
+                                expected(mixed))
+            assert seen == ['boring acting', 'the plot was great']
+
+            # Nova conexão ao mesmo arquivo (nova execução do notebook): nada roda
+            seen.clear()
+            reopened = open_cache()
+            assert same_results(reopened.analyze(tiny_texts + mixed, analyzer=tiny_analyzer),
+                                expected(tiny_texts) + expected(mixed))
+            assert seen == [] and reopened.hit_rate() == 1.0
+
+            # Outro modelo ou outro limite de truncamento não reaproveitam os resultados
+            assert open_cache('outro-modelo').get_many(['good movie']) == [None]
+            assert open_cache(max_length=32).get_many(['good movie']) == [None]
+            print(f"Cache verificado com o modelo local ({len(reopened)} textos em cache)")
+        finally:
+            for cache in caches:
+                cache.connection.close()
+
+if __name__ == '__main__':
+    check_sentiment_cache()
+
 """# 1. Carregamento e Preparação dos Dados"""
 
 print("Carregando o dataset IMDB...")
@@ -54,7 +259,8 @@ print(df['sentiment'].value_counts())
 sentiment_analyzer = pipeline('sentiment-analysis')
 
 def analyze_sentiment_huggingface(text):
-    result = sentiment_analyzer(text[:512])
+    # Truncar por tokens (limite do modelo), não por caracteres
+    result = sentiment_analyzer(text, truncation=True)
     return result[0]
 
 print("\nAnálise de Sentimentos com Hugging Face:")
@@ -64,9 +270,54 @@ for i in range(5):
     print(f"\nReview: {review[:100]}...")
     print(f"Sentimento: {result['label']}, Score: {result['score']:.3f}")
 
+"""## Inferência em lotes ordenados por tamanho (CPU)"""
+
+# Benchmark: um review por vez x lotes ordenados por tamanho
+sample = df['review'].iloc[:200].tolist()
+
+start = time.perf_counter()
+single_results = [analyze_sentiment_huggingface(review) for review in sample]
+single_rate = len(sample) / (time.perf_counter() - start)
+
+batched_results = analyze_sentiment_batched(sample[:8])  # aquecimento
+start = time.perf_counter()
+batched_results = analyze_sentiment_batched(sample)
+batched_rate = len(sample) / (time.perf_counter() - start)
+
+agreement = np.mean([a['label'] == b['label'] for a, b in zip(single_results, batched_results)])
+print(f"\nUm review por vez: {single_rate:.1f} reviews/s")
+print(f"Em lotes: {batched_rate:.1f} reviews/s ({batched_rate / single_rate:.1f}x)")
+print(f"Concordância entre os dois caminhos: {agreement:.1%}")
+
+for batch_size in [8, 32, 64]:
+    start = time.perf_counter()
+    analyze_sentiment_batched(sample, batch_size=batch_size)
+    print(f"batch_size={batch_size}: {len(sample) / (time.perf_counter() - start):.1f} reviews/s")
+
+"""## Cache persistente dos resultados do transformer (SQLite)"""
+
+print("\nClassificando todos os reviews em lotes (com cache)...")
+hf_cache = SentimentCache(sentiment_analyzer.model.name_or_path)
+start = time.perf_counter()
+hf_results = hf_cache.analyze(df['review'])
+elapsed = time.perf_counter() - start
+print(f"{len(df)} reviews em {elapsed / 60:.1f} min ({len(df) / elapsed:.1f} reviews/s)")
+print(f"Cache: {hf_cache.hits} acertos, {hf_cache.misses} faltas "
+      f"(taxa de acerto {hf_cache.hit_rate():.1%}, {len(hf_cache)} textos em {hf_cache.path})")
+
+df['hf_label'] = [result['label'] for result in hf_results]
+df['hf_score'] = [result['score'] for result in hf_results]
+hf_accuracy = np.mean((df['hf_label'] == 'POSITIVE').astype(int) == df['sentiment'])
+print(f"Acurácia do modelo Hugging Face: {hf_accuracy:.3f}")
+
 """# 3. Vetorização com NLTK e TF-IDF"""
 
-def preprocess_text(text):
+import re
+import os
+from multiprocessing import Pool
+
+# Versão original (NLTK word_tokenize), mantida como referência para o benchmark
+def preprocess_text_nltk(text):
     if isinstance(text, bytes):
         text = text.decode('utf-8')
 
@@ -76,8 +327,67 @@ def preprocess_text(text):
 
     return ' '.join(words)
 
-print("Pré-processando os textos...")
-df['processed_review'] = df['review'].apply(preprocess_text)
+class TextPreprocessor:
+    """
+    Pré-processamento reutilizável: as stopwords são carregadas uma única vez
+    e a tokenização usa uma regex compilada no lugar do word_tokenize (Punkt).
+    A regex pega sequências alfanuméricas, o mesmo que sobrevivia ao filtro
+    isalnum(); a diferença é que palavras com hífen ou apóstrofo ("well-made",
+    "don't") viram duas palavras em vez de serem descartadas.
+    """
+
+    TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+    def __init__(self, language='english'):
+        self.stop_words = frozenset(stopwords.words(language))
+
+    def __call__(self, text):
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        words = self.TOKEN_PATTERN.findall(str(text).lower())
+        return ' '.join(word for word in words if word not in self.stop_words)
+
+    def transform(self, texts, n_jobs=1, chunksize=250):
+        """
+        Pré-processa uma lista de textos, em vários processos se n_jobs > 1
+        (None usa todos os núcleos), mantendo a ordem original
+        """
+        texts = list(texts)
+        n_jobs = n_jobs or os.cpu_count()
+        if n_jobs == 1 or len(texts) < 2 * chunksize:
+            return [self(text) for text in texts]
+        with Pool(n_jobs) as pool:
+            return pool.map(self, texts, chunksize=chunksize)
+
+preprocess_text = TextPreprocessor()
+
+# Throughput antes e depois nos reviews do dataset
+print("Comparando o pré-processamento...")
+start = time.perf_counter()
+nltk_processed = df['review'].apply(preprocess_text_nltk)
+nltk_rate = len(df) / (time.perf_counter() - start)
+
+start = time.perf_counter()
+regex_processed = preprocess_text.transform(df['review'])
+regex_rate = len(df) / (time.perf_counter() - start)
+
+start = time.perf_counter()
+parallel_processed = preprocess_text.transform(df['review'], n_jobs=None)
+parallel_rate = len(df) / (time.perf_counter() - start)
+
+assert parallel_processed == regex_processed
+print(f"NLTK (word_tokenize + stopwords a cada chamada): {nltk_rate:.0f} reviews/s")
+print(f"TextPreprocessor (regex, 1 processo): {regex_rate:.0f} reviews/s ({regex_rate / nltk_rate:.1f}x)")
+print(f"TextPreprocessor ({os.cpu_count()} processos): {parallel_rate:.0f} reviews/s "
+      f"({parallel_rate / nltk_rate:.1f}x)")
+
+# Equivalência para o TF-IDF: sobreposição dos vocabulários resultantes
+nltk_vocabulary = set(TfidfVectorizer(max_features=5000).fit(nltk_processed).vocabulary_)
+regex_vocabulary = set(TfidfVectorizer(max_features=5000).fit(regex_processed).vocabulary_)
+print(f"Textos idênticos: {np.mean([a == b for a, b in zip(nltk_processed, regex_processed)]):.1%}, "
+      f"vocabulário TF-IDF em comum: {len(nltk_vocabulary & regex_vocabulary) / len(nltk_vocabulary):.1%}")
+
+df['processed_review'] = regex_processed
 
 print("\nRealizando vetorização TF-IDF...")
 vectorizer = TfidfVectorizer(max_features=5000)
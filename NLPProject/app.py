@@ -1,20 +1,236 @@
-from flask import Flask, request, jsonify
+import time
+
+# Medir o tempo de inicialização da aplicação (incluindo as importações)
+startup_start = time.perf_counter()
+
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from utils.preprocessing import TextPreprocessor
-from utils.training import SentimentClassifier
+from utils.cache import ResultCache
+from utils.registry import ModelRegistry
+from utils.cascade import escalate
+from utils import metrics
+import numpy as np
+import json
 import os
 
 app = Flask(__name__)
 
-# Inicializar preprocessador e classificador
+# Tamanho máximo de lote aceito pelo endpoint /analyze_batch
+app.config['MAX_BATCH_SIZE'] = int(os.environ.get('MAX_BATCH_SIZE', 1000))
+
+# Textos classificados por vez no endpoint /analyze_stream
+app.config['STREAM_CHUNK_SIZE'] = int(os.environ.get('STREAM_CHUNK_SIZE', 500))
+
+# Formatos de saída aceitos pelo endpoint /vectorize
+VECTOR_FORMATS = ('terms', 'indices')
+
+# Inicializar preprocessador
 preprocessor = TextPreprocessor()
 
+# Cache de resultados por texto (RESULT_CACHE_SIZE=0 desativa)
+result_cache = ResultCache(
+    maxsize=int(os.environ.get('RESULT_CACHE_SIZE', 10000)),
+    ttl=float(os.environ.get('RESULT_CACHE_TTL', 300)) or None
+)
+
+# Contadores do cache expostos em /metrics
+metrics.CallbackGauge(
+    'sentiment_result_cache',
+    'Estado e contadores do cache de resultados',
+    lambda: {key: value for key, value in result_cache.stats().items()
+             if value is not None}
+)
+
+
+def on_model_swap(bundle, previous):
+    # Resultados de outro modelo não podem ser reaproveitados
+    result_cache.clear()
+
+
+# Modelo em uso, com recarga sem interrupção (FAST_INFERENCE=0 desativa o
+# motor NumPy para textos individuais; VOCAB_SHORTCUT=1 classifica direto
+# pelo vocabulário do modelo, sem lematizar tokens que ele não conhece)
+registry = ModelRegistry(
+    os.environ.get('MODELS_DIR', 'models'),
+    fast_inference=os.environ.get('FAST_INFERENCE', '1') != '0',
+    on_swap=[on_model_swap],
+    shortcut_preprocessor=preprocessor if os.environ.get('VOCAB_SHORTCUT') == '1' else None
+)
+
+# Modo cascata (CASCADE_THRESHOLD > 0): textos com confiança do Naive Bayes
+# abaixo do limiar são reclassificados por um transformer
+CASCADE_THRESHOLD = float(os.environ.get('CASCADE_THRESHOLD', 0))
+transformer = None
+if CASCADE_THRESHOLD > 0:
+    from utils.transformer import DEFAULT_TRANSFORMER, TransformerScorer
+
+    transformer = TransformerScorer(
+        os.environ.get('TRANSFORMER_MODEL', DEFAULT_TRANSFORMER),
+        batch_size=int(os.environ.get('TRANSFORMER_BATCH_SIZE', 32))
+    )
+
+# Token exigido no endpoint /admin/reload (vazio = endpoint desativado)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
 # Carregar modelo se existir
-if os.path.exists('models/vectorizer.pkl') and os.path.exists('models/classifier.pkl'):
-    classifier = SentimentClassifier.load_model('models/vectorizer.pkl', 'models/classifier.pkl')
+try:
+    registry.reload()
     print("Modelo carregado com sucesso!")
-else:
+except FileNotFoundError:
     print("Modelo não encontrado. Execute train_model.py primeiro!")
-    classifier = None
+
+# Verificar periodicamente novas versões (MODEL_WATCH_INTERVAL=0 desativa)
+watch_interval = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+if watch_interval > 0:
+    registry.start_watcher(watch_interval)
+
+# Recursos do NLTK são carregados sob demanda pelo TextPreprocessor
+print(f"Aplicação iniciada em {time.perf_counter() - startup_start:.2f}s")
+
+
+def analyze_texts(texts, bundle=None, use_cache=True):
+    """
+    Analisa uma lista de textos, reaproveitando o cache e fazendo uma única
+    chamada ao modelo para os textos ainda não vistos (use_cache=False evita
+    que cargas em massa tirem do cache os textos frequentes)
+    """
+    # Todo o processamento usa o mesmo modelo, mesmo se houver troca no meio
+    bundle = bundle or registry.current
+
+    # Textos repetidos dispensam pré-processamento e classificação
+    cache_keys = [ResultCache.make_key(text, bundle.version, 'analyze')
+                  for text in texts]
+    results = [result_cache.get(key) if use_cache else None for key in cache_keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    for text in texts:
+        metrics.TEXT_LENGTH.observe(len(str(text)))
+
+    if missing:
+        metrics.BATCH_SIZE.observe(len(missing))
+
+        if bundle.shortcut:
+            # Atalho de vocabulário: índices dos termos direto do texto original
+            # (processed_text traz apenas os termos do vocabulário)
+            with metrics.STAGE_LATENCY.time('preprocess'):
+                vectors, processed_texts = zip(*map(bundle.shortcut.vectorize,
+                                                    [texts[i] for i in missing]))
+            predictions, probabilities, confidences = bundle.engine.score_vectors(vectors)
+        else:
+            # Pré-processar os textos que faltam
+            with metrics.STAGE_LATENCY.time('preprocess'):
+                processed_texts = [preprocessor.preprocess(texts[i]) for i in missing]
+
+            # Uma única vetorização e uma única chamada a predict_proba para o
+            # lote; textos individuais usam o motor rápido quando disponível
+            scorer = bundle.engine if bundle.engine and len(missing) == 1 else bundle.classifier
+            predictions, probabilities, confidences = scorer.score(processed_texts)
+
+        # Textos de baixa confiança seguem, em um único lote, para o transformer
+        escalated = None
+        if transformer is not None:
+            predictions, _, confidences, escalated = escalate(
+                [texts[i] for i in missing], predictions, probabilities, confidences,
+                transformer, CASCADE_THRESHOLD
+            )
+
+        for position, (i, processed_text, prediction, confidence) in enumerate(zip(
+                missing, processed_texts, predictions, confidences)):
+            results[i] = {
+                'sentiment': 'positivo' if prediction == 1 else 'negativo',
+                'confidence': float(confidence),
+                'processed_text': processed_text,
+                'model_version': bundle.version
+            }
+            if escalated is not None:
+                results[i]['model'] = 'transformer' if escalated[position] else 'naive_bayes'
+            if use_cache:
+                result_cache.put(cache_keys[i], results[i])
+
+    return results
+
+
+def vectorize_text(text, top_k=None, output_format='terms', bundle=None):
+    """
+    Retorna os pesos TF-IDF não nulos do texto a partir da linha esparsa
+    """
+    bundle = bundle or registry.current
+    classifier = bundle.classifier
+
+    cache_key = ResultCache.make_key(
+        text, bundle.version, 'vectorize', top_k, output_format)
+    metrics.TEXT_LENGTH.observe(len(str(text)))
+    result = result_cache.get(cache_key)
+    if result is not None:
+        return result
+
+    # Pré-processar texto
+    with metrics.STAGE_LATENCY.time('preprocess'):
+        processed_text = preprocessor.preprocess(text)
+
+    # Vetorizar texto usando TF-IDF (matriz esparsa CSR com uma linha)
+    with metrics.STAGE_LATENCY.time('vectorize'):
+        vector = classifier.vectorizer.transform([processed_text])
+
+    # Trabalhar apenas sobre os termos não nulos da linha
+    indices = vector.indices
+    values = vector.data
+    nonzero = values > 0
+    indices = indices[nonzero]
+    values = values[nonzero]
+
+    if top_k is not None and top_k < len(values):
+        order = np.argsort(-values, kind='stable')[:top_k]
+        indices = indices[order]
+        values = values[order]
+
+    # Modelos sem vocabulário (hashing) só podem retornar índices
+    feature_names = classifier.feature_names
+    if output_format == 'indices' or feature_names is None:
+        # Formato compacto: índices do vocabulário e pesos em paralelo
+        vector_dict = {
+            'indices': indices.tolist(),
+            'values': values.tolist()
+        }
+    else:
+        # Criar dicionário com termos e seus valores TF-IDF
+        vector_dict = {
+            feature_names[index]: value
+            for index, value in zip(indices.tolist(), values.tolist())
+        }
+
+    result = {
+        'processed_text': processed_text,
+        'vector': vector_dict,
+        'model_version': bundle.version
+    }
+    result_cache.put(cache_key, result)
+    return result
+
+
+def validate_vectorize_options(top_k, output_format):
+    """
+    Retorna uma mensagem de erro se as opções de /vectorize forem inválidas
+    """
+    if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool)
+                              or top_k <= 0):
+        return 'top_k deve ser um inteiro positivo'
+    if output_format not in VECTOR_FORMATS:
+        return f'Formato inválido, use um de: {", ".join(VECTOR_FORMATS)}'
+    return None
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    # Usar o nome do endpoint (e não o caminho) para limitar a cardinalidade
+    metrics.observe_request(request.endpoint or 'desconhecido', response.status_code,
+                            time.perf_counter() - g.request_start)
+    return response
 
 
 @app.route('/analyze_sentiment', methods=['POST'])
@@ -26,32 +242,147 @@ def analyze_sentiment():
         if not text:
             return jsonify({'error': 'Nenhum texto fornecido'}), 400
 
-        # Pré-processar texto
-        processed_text = preprocessor.preprocess(text)
-
         # Fazer previsão
-        if classifier:
-            # Fazer previsão e obter probabilidades
-            probabilities = classifier.predict_proba([processed_text])[0]
-            prediction = classifier.predict([processed_text])[0]
+        bundle = registry.current
+        if bundle:
+            result = analyze_texts([text], bundle)[0]
+            return jsonify({'text': text, **result})
+        else:
+            return jsonify({'error': 'Modelo não carregado'}), 500
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/analyze_batch', methods=['POST'])
+def analyze_batch():
+    try:
+        data = request.get_json()
+        items = data.get('texts')
 
-            # Mapear resultado
-            sentiment = 'positivo' if prediction == 1 else 'negativo'
-            confidence = float(max(probabilities))
+        if not items or not isinstance(items, list):
+            return jsonify({'error': 'Nenhuma lista de textos fornecida'}), 400
 
+        max_batch_size = app.config['MAX_BATCH_SIZE']
+        if len(items) > max_batch_size:
             return jsonify({
-                'text': text,
-                'sentiment': sentiment,
-                'confidence': confidence,
-                'processed_text': processed_text
-            })
-        else:
+                'error': f'Lote excede o tamanho máximo de {max_batch_size} textos'
+            }), 413
+
+        # Aceitar tanto strings simples quanto objetos {"id": ..., "text": ...}
+        ids = []
+        texts = []
+        for position, item in enumerate(items):
+            if isinstance(item, dict):
+                ids.append(item.get('id', position))
+                texts.append(item.get('text'))
+            else:
+                ids.append(position)
+                texts.append(item)
+
+        if any(not text for text in texts):
+            return jsonify({'error': 'Todos os itens precisam de um texto'}), 400
+
+        bundle = registry.current
+        if not bundle:
             return jsonify({'error': 'Modelo não carregado'}), 500
 
+        results = [
+            {'id': item_id, 'text': text, **result}
+            for item_id, text, result in zip(ids, texts, analyze_texts(texts, bundle))
+        ]
+
+        return jsonify({'results': results, 'model_version': bundle.version})
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def parse_stream_item(line, position):
+    """
+    Converte uma linha NDJSON em (id, texto, erro); aceita uma string ou um
+    objeto {"id": ..., "text": ...}. Sem "id", o id é a posição do registro
+    (0, 1, ...) contando só as linhas não vazias, como em /analyze_batch
+    """
+    try:
+        item = json.loads(line)
+    except ValueError:
+        return position, None, 'JSON inválido'
+
+    if isinstance(item, dict):
+        item_id, text = item.get('id', position), item.get('text')
+    else:
+        item_id, text = position, item
+
+    if not text or not isinstance(text, str):
+        return item_id, None, 'Nenhum texto fornecido'
+    return item_id, text, None
+
+
+def score_stream(lines, bundle, chunk_size):
+    """
+    Lê as linhas sob demanda e produz os resultados em NDJSON, na ordem da
+    entrada, classificando um bloco de chunk_size linhas por vez; a memória
+    não cresce com o tamanho do upload
+    """
+    chunk = []
+    scored = 0
+    errors = 0
+
+    def flush():
+        # Linhas inválidas ficam no bloco para manter a ordem da saída
+        texts = [text for _, text, error in chunk if error is None]
+        results = iter(analyze_texts(texts, bundle, use_cache=False) if texts else [])
+        output = []
+        for item_id, _, error in chunk:
+            record = error or {'id': item_id, **next(results)}
+            output.append(json.dumps(record, ensure_ascii=False) + '\n')
+        chunk.clear()
+        return ''.join(output)
+
+    position = 0
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        # Erros trazem também o número da linha (a partir de 1) no upload
+        item_id, text, error = parse_stream_item(line, position)
+        position += 1
+        if error:
+            errors += 1
+            chunk.append((item_id, None, {'id': item_id, 'line': line_number, 'error': error}))
+        else:
+            scored += 1
+            chunk.append((item_id, text, None))
+
+        if len(chunk) >= chunk_size:
+            yield flush()
+
+    if chunk:
+        yield flush()
+
+    # Linha final para o cliente confirmar que o arquivo foi todo processado
+    yield json.dumps({'summary': {'scored': scored, 'errors': errors,
+                                  'model_version': bundle.version}}) + '\n'
+
+
+@app.route('/analyze_stream', methods=['POST'])
+def analyze_stream():
+    """
+    Recebe NDJSON (um texto por linha) e devolve NDJSON à medida que classifica.
+    O corpo é lido durante a resposta, então o cliente precisa ler a resposta
+    enquanto envia (ex.: curl -T arquivo.ndjson)
+    """
+    bundle = registry.current
+    if not bundle:
+        return jsonify({'error': 'Modelo não carregado'}), 500
+
+    # Todo o upload usa o mesmo modelo, mesmo se houver troca no meio
+    lines = (line.decode('utf-8', errors='replace') for line in request.stream)
+    output = score_stream(lines, bundle, app.config['STREAM_CHUNK_SIZE'])
+    return Response(stream_with_context(output), mimetype='application/x-ndjson')
+
+
 @app.route('/vectorize', methods=['POST'])
 def vectorize():
     try:
@@ -61,26 +392,18 @@ def vectorize():
         if not text:
             return jsonify({'error': 'Nenhum texto fornecido'}), 400
 
-        # Pré-processar texto
-        processed_text = preprocessor.preprocess(text)
-
-        if classifier:
-            # Vetorizar texto usando TF-IDF
-            vector = classifier.vectorizer.transform([processed_text])
+        # Parâmetros opcionais: limitar aos k maiores pesos e formato da saída
+        top_k = data.get('top_k')
+        output_format = data.get('format', 'terms')
 
-            # Criar dicionário com termos e seus valores TF-IDF
-            feature_names = classifier.vectorizer.get_feature_names_out()
-            vector_dict = {
-                term: float(value)
-                for term, value in zip(feature_names, vector.toarray()[0])
-                if value > 0
-            }
+        error = validate_vectorize_options(top_k, output_format)
+        if error:
+            return jsonify({'error': error}), 400
 
-            return jsonify({
-                'text': text,
-                'processed_text': processed_text,
-                'vector': vector_dict
-            })
+        bundle = registry.current
+        if bundle:
+            result = vectorize_text(text, top_k, output_format, bundle)
+            return jsonify({'text': text, **result})
         else:
             return jsonify({'error': 'Modelo não carregado'}), 500
 
@@ -88,5 +411,55 @@ def vectorize():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    return jsonify(result_cache.stats())
+
+
+@app.route('/admin/model', methods=['GET'])
+def model_info():
+    bundle = registry.current
+    return jsonify({
+        'model': bundle.describe() if bundle else None,
+        'last_error': registry.last_error
+    })
+
+
+@app.route('/admin/reload', methods=['POST'])
+def reload_model():
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Recarga desativada: defina ADMIN_TOKEN'}), 403
+    if request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+
+    # Apenas nomes de diretórios dentro de models/ (nunca caminhos)
+    if version is not None:
+        try:
+            registry.resolve(version)
+        except (ValueError, FileNotFoundError) as e:
+            return jsonify({'error': str(e)}), 400
+
+    # Uma versão explícita passa a ser a CURRENT, para o watcher não desfazer
+    # a troca. Com wait=true a resposta só volta após a troca; sem ele a
+    # carga acontece em segundo plano e a resposta é imediata
+    if data.get('wait'):
+        try:
+            bundle = registry.reload(version, make_current=True)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        return jsonify({'status': 'recarregado', 'model': bundle.describe()})
+
+    registry.reload_in_background(version, make_current=True)
+    return jsonify({'status': 'recarregando', 'version': version}), 202
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
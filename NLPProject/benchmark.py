@@ -0,0 +1,232 @@
+from utils.benchmarking import LENGTH_DISTRIBUTIONS, generate_reviews, summarize, time_calls
+from utils.preprocessing import TextPreprocessor
+from utils.registry import ModelRegistry, ARTIFACT_NAME, load_classifier_from_dir
+from utils.inference import FastSentimentEngine
+from datetime import datetime
+import numpy as np
+import argparse
+import platform
+import tempfile
+import sklearn
+import json
+import os
+
+
+BENCHMARKS = ('preprocess', 'predict', 'load', 'endpoints')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Mede o desempenho dos caminhos principais do NLPProject")
+    parser.add_argument('--texts', type=int, default=1000, help="quantidade de reviews sintéticos")
+    parser.add_argument('--mean-words', type=int, default=150, help="tamanho médio dos reviews (palavras)")
+    parser.add_argument('--distribution', choices=LENGTH_DISTRIBUTIONS, default='lognormal',
+                        help="distribuição do tamanho dos reviews")
+    parser.add_argument('--batch-sizes', default='1,32,256,1024',
+                        help="tamanhos de lote para predict/predict_proba")
+    parser.add_argument('--load-repeats', type=int, default=5, help="repetições da carga do modelo")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', default=','.join(BENCHMARKS),
+                        help=f"benchmarks a executar ({','.join(BENCHMARKS)})")
+    parser.add_argument('--output', default='benchmarks', help="diretório dos resultados JSON")
+    parser.add_argument('--compare', help="arquivo JSON de uma execução anterior para comparar")
+    return parser.parse_args()
+
+
+def bench_preprocess(texts):
+    """
+    Vazão do TextPreprocessor.preprocess, com o cache de lemas frio e quente
+    """
+    preprocessor = TextPreprocessor()
+    preprocessor.load()
+    # O WordNet só é lido na primeira lematização; fora da medição
+    preprocessor.preprocess('benchmarking')
+
+    results = {}
+    for name in ('cold', 'warm'):
+        # Na primeira passada o cache de lemas começa (quase) vazio
+        latencies = time_calls(preprocessor.preprocess, texts, warmup=0)
+        results[name] = summarize(latencies, items=len(texts))
+    return results
+
+
+def bench_batches(function, texts, batch_sizes):
+    results = {}
+    # Lotes maiores que o corpus viram um lote com todos os textos, rotulado
+    # pelo tamanho real
+    for batch_size in sorted({min(size, len(texts)) for size in batch_sizes if size > 0}):
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        # Lotes grandes repetem os textos para ter várias medições
+        while len(batches) < 20:
+            batches.append(texts[:batch_size])
+        latencies = time_calls(function, batches)
+        results[f'batch_{batch_size}'] = summarize(latencies, items=sum(map(len, batches)))
+    return results
+
+
+def bench_predict(classifier, processed, batch_sizes):
+    """
+    Latência de predict/predict_proba para textos individuais e em lote
+    """
+    scorers = {'sklearn': classifier}
+    try:
+        scorers['engine'] = FastSentimentEngine.from_classifier(classifier)
+    except ValueError:
+        pass
+
+    results = {}
+    for name, scorer in scorers.items():
+        for method in ('predict', 'predict_proba'):
+            function = getattr(scorer, method)
+            single = time_calls(lambda text: function([text]), processed)
+            results[f'{name}.{method}'] = {
+                'single': summarize(single, items=len(processed)),
+                **bench_batches(function, processed, batch_sizes)
+            }
+    return results
+
+
+def bench_load(classifier, models_dir, repeats):
+    """
+    Tempo de carga do modelo nos formatos pickle e mapeável
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = {'pickle': os.path.join(tmp_dir, 'pickle'), 'mmap': os.path.join(tmp_dir, 'mmap')}
+        os.makedirs(paths['pickle'])
+        os.makedirs(paths['mmap'])
+        classifier.save_model(os.path.join(paths['pickle'], 'vectorizer.pkl'),
+                              os.path.join(paths['pickle'], 'classifier.pkl'))
+        try:
+            classifier.save_artifact(os.path.join(paths['mmap'], ARTIFACT_NAME))
+        except ValueError:
+            del paths['mmap']
+
+        for name, path in paths.items():
+            results[name] = summarize(time_calls(load_classifier_from_dir, [path] * repeats, warmup=1))
+
+    # Carga completa pelo registro (inclui motor rápido e aquecimento)
+    registry = ModelRegistry(models_dir)
+    results['registry'] = summarize(time_calls(lambda _: registry.load(), [None] * repeats, warmup=1))
+    return results
+
+
+def bench_endpoints(texts):
+    """
+    Latência ponta a ponta pelo cliente de testes do Flask, sem o cache de
+    resultados
+    """
+    os.environ['RESULT_CACHE_SIZE'] = '0'
+    import app as service
+
+    client = service.app.test_client()
+    requests = {
+        'analyze_sentiment': ('/analyze_sentiment', lambda text: {'text': text}),
+        'vectorize': ('/vectorize', lambda text: {'text': text, 'top_k': 20})
+    }
+
+    results = {}
+    for name, (url, payload) in requests.items():
+        def call(text):
+            response = client.post(url, json=payload(text))
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} respondeu {response.status_code}: {response.get_data(as_text=True)}")
+        results[name] = summarize(time_calls(call, texts), items=len(texts))
+    return results
+
+
+def print_results(results, prefix=''):
+    for name, value in results.items():
+        if isinstance(value, dict) and 'p50_ms' not in value:
+            print_results(value, f'{prefix}{name}.')
+        elif isinstance(value, dict):
+            throughput = value.get('throughput_per_s')
+            throughput = f" {throughput:10.0f}/s" if throughput else ''
+            print(f"{prefix + name:<40} p50={value['p50_ms']:9.3f}ms p95={value['p95_ms']:9.3f}ms "
+                  f"p99={value['p99_ms']:9.3f}ms{throughput}")
+
+
+def flatten(results, prefix=''):
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, dict) and 'p50_ms' not in value:
+            flat.update(flatten(value, f'{prefix}{name}.'))
+        elif isinstance(value, dict):
+            flat[prefix + name] = value
+    return flat
+
+
+def print_comparison(results, previous_path):
+    """
+    Compara o p50 e o p95 com uma execução anterior (razão atual/anterior)
+    """
+    with open(previous_path) as f:
+        previous = flatten(json.load(f)['results'])
+
+    print(f"\nComparação com {previous_path} (atual / anterior):")
+    for name, value in flatten(results).items():
+        if name in previous:
+            old = previous[name]
+            print(f"{name:<40} p50 x{value['p50_ms'] / old['p50_ms']:6.2f} "
+                  f"p95 x{value['p95_ms'] / old['p95_ms']:6.2f}")
+
+
+def main():
+    args = parse_args()
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Benchmarks desconhecidos: {', '.join(sorted(unknown))}")
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+
+    texts = [text for text, _ in generate_reviews(args.texts, args.mean_words,
+                                                   args.distribution, seed=args.seed)]
+    lengths = [len(text.split()) for text in texts]
+    print(f"{len(texts)} reviews sintéticos, {np.mean(lengths):.0f} palavras em média "
+          f"(máximo {max(lengths)})")
+
+    results = {}
+    model_version = None
+    if 'preprocess' in selected:
+        results['preprocess'] = bench_preprocess(texts)
+
+    if {'predict', 'load'} & set(selected):
+        models_dir = os.environ.get('MODELS_DIR', 'models')
+        bundle = ModelRegistry(models_dir, fast_inference=False).load()
+        model_version = bundle.version
+        if 'predict' in selected:
+            processed = TextPreprocessor().preprocess_many(texts)
+            results['predict'] = bench_predict(bundle.classifier, processed, batch_sizes)
+        if 'load' in selected:
+            results['load'] = bench_load(bundle.classifier, models_dir, args.load_repeats)
+
+    if 'endpoints' in selected:
+        results['endpoints'] = bench_endpoints(texts)
+
+    print()
+    print_results(results)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'sklearn': sklearn.__version__,
+            'model_version': model_version,
+            'args': vars(args)
+        },
+        'results': results
+    }
+    os.makedirs(args.output, exist_ok=True)
+    output_path = os.path.join(args.output, f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados salvos em {output_path}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+from utils.registry import ModelRegistry
+from utils.inference import FastSentimentEngine, check_equivalence
+from utils.preprocessing import TextPreprocessor
+from utils.shortcut import VocabularyShortcut, check_shortcut
+from utils.benchmarking import generate_reviews
+import numpy as np
+import argparse
+import random
+import time
+import sys
+
+
+def sample_texts(classifier, n_texts, seed=42):
+    """
+    Gera textos pré-processados misturando termos do vocabulário e palavras
+    desconhecidas, com tamanhos variados
+    """
+    rng = random.Random(seed)
+    vocabulary = list(classifier.feature_names)
+    unknown = ['zzzunknown', 'qwerty', 'lorem', 'ipsum']
+    texts = ['']
+    for _ in range(n_texts - 1):
+        length = rng.randint(1, 60)
+        texts.append(' '.join(
+            rng.choice(vocabulary) if rng.random() < 0.8 else rng.choice(unknown)
+            for _ in range(length)
+        ))
+    return texts
+
+
+def time_single(score, texts):
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        score([text])
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1e6
+
+
+def print_latencies(name, latencies):
+    print(f"{name:>14}: p50={np.percentile(latencies, 50):8.1f} "
+          f"p95={np.percentile(latencies, 95):8.1f} "
+          f"p99={np.percentile(latencies, 99):8.1f}")
+
+
+def run_check(name, check):
+    """
+    Executa uma verificação de equivalência e informa se passou
+    """
+    try:
+        difference = check()
+    except AssertionError as e:
+        print(f"FALHOU - {name}: {e}")
+        return False
+    print(f"OK - {name} (diferença máxima {difference:.2e})")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara o motor NumPy com o SentimentClassifier (scikit-learn); "
+                    "termina com código 1 se algum caminho divergir")
+    parser.add_argument('--texts', type=int, default=2000, help="quantidade de textos")
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--check-only', action='store_true',
+                        help="apenas as verificações de equivalência, sem medir latência")
+    args = parser.parse_args()
+
+    classifier = ModelRegistry(args.models_dir, fast_inference=False).load().classifier
+    engine = FastSentimentEngine.from_classifier(classifier)
+    texts = sample_texts(classifier, args.texts)
+
+    # Atalho de vocabulário, avaliado sobre reviews brutos
+    preprocessor = TextPreprocessor()
+    shortcut = VocabularyShortcut.from_model(preprocessor, classifier, engine)
+    reviews = [text for text, _ in generate_reviews(args.texts)]
+
+    # Equivalência das probabilidades
+    passed = all([
+        run_check(f"motor NumPy x scikit-learn em {len(texts)} textos",
+                  lambda: check_equivalence(classifier, engine, texts)),
+        run_check(f"atalho de vocabulário ({len(shortcut.surface_index)} formas para "
+                  f"{len(shortcut.terms)} termos) em {len(reviews)} reviews",
+                  lambda: check_shortcut(shortcut, reviews))
+    ])
+    if not passed:
+        return 1
+    if args.check_only:
+        return 0
+
+    # Latência por texto individual
+    print("\nLatência por requisição de um único texto (µs):")
+    for name, scorer in [('scikit-learn', classifier), ('motor NumPy', engine)]:
+        print_latencies(name, time_single(scorer.predict_proba, texts))
+
+    print("\nLatência com pré-processamento, cache de lemas quente (µs):")
+    print_latencies('pré-proc.+motor',
+                    time_single(lambda batch: engine.score(preprocessor.preprocess_many(batch)), reviews))
+    print_latencies('atalho', time_single(shortcut.score, reviews))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
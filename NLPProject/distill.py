@@ -0,0 +1,147 @@
+"""
+Destilação do transformer no modelo TF-IDF + Naive Bayes usado pelo app.
+
+1. Rotula um corpus sem rótulos com o transformer (probabilidades suaves),
+   guardando os rótulos em disco para reaproveitar em novas execuções;
+2. treina o SentimentClassifier com esses rótulos suaves;
+3. salva o resultado como uma nova versão em models/ (mesmos artefatos que o
+   app.py carrega).
+
+Exemplo:
+    python distill.py data/imdb/train/unsup --eval-data data/imdb/test --limit 50000
+"""
+from utils.datasets import load_dataset, load_unlabeled_texts
+from utils.preprocessing import TextPreprocessor
+from utils.registry import ModelRegistry, save_versioned
+from utils.training import SentimentClassifier
+from utils.transformer import DEFAULT_TRANSFORMER, TransformerScorer
+import numpy as np
+import argparse
+import hashlib
+import time
+import os
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Destila o transformer no modelo TF-IDF + Naive Bayes")
+    parser.add_argument('unlabeled', help="diretório com .txt, JSONL ou CSV de textos sem rótulo")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--limit', type=int, help="usar apenas os primeiros N textos")
+    parser.add_argument('--transformer-model', default=DEFAULT_TRANSFORMER)
+    parser.add_argument('--batch-size', type=int, default=32, help="lote do transformer")
+    parser.add_argument('--chunksize', type=int, default=2000,
+                        help="textos rotulados entre cada relatório de progresso")
+    parser.add_argument('--temperature', type=float, default=1.0,
+                        help="suavização dos rótulos (>1 deixa as probabilidades menos extremas)")
+    parser.add_argument('--labels-dir', default='data/soft_labels',
+                        help="diretório dos rótulos suaves em cache")
+    parser.add_argument('--holdout', type=float, default=0.1,
+                        help="fração do corpus reservada para medir a fidelidade ao transformer")
+    parser.add_argument('--eval-data', help="dataset rotulado (IMDB ou CSV) para medir a acurácia")
+    parser.add_argument('--n-jobs', type=int, default=None, help="processos para o pré-processamento")
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--no-activate', action='store_true',
+                        help="salvar a versão sem torná-la a atual")
+    return parser.parse_args()
+
+
+def soft_labels_path(labels_dir, texts, model_name):
+    digest = hashlib.sha256(model_name.encode('utf-8'))
+    for text in texts:
+        digest.update(hashlib.sha256(text.encode('utf-8')).digest())
+    return os.path.join(labels_dir, f'{digest.hexdigest()[:16]}.npy')
+
+
+def label_corpus(transformer, texts, chunksize):
+    """
+    Probabilidades do transformer para todo o corpus, com progresso
+    """
+    probabilities = np.zeros((len(texts), 2))
+    start = time.perf_counter()
+    for offset in range(0, len(texts), chunksize):
+        chunk = texts[offset:offset + chunksize]
+        probabilities[offset:offset + len(chunk)] = transformer.predict_proba(chunk)
+        done = offset + len(chunk)
+        elapsed = time.perf_counter() - start
+        print(f"[rótulos] {done}/{len(texts)} textos em {elapsed:.0f}s "
+              f"({done / elapsed:.1f} textos/s)")
+    return probabilities
+
+
+def soften(probabilities, temperature):
+    """
+    Aplica a temperatura sobre as log-probabilidades e renormaliza
+    """
+    if temperature == 1.0:
+        return probabilities
+    logits = np.log(np.clip(probabilities, 1e-12, 1.0)) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    softened = np.exp(logits)
+    return softened / softened.sum(axis=1, keepdims=True)
+
+
+def main():
+    args = parse_args()
+    texts = load_unlabeled_texts(args.unlabeled, args.text_column)
+    if args.limit:
+        texts = texts[:args.limit]
+    print(f"{len(texts)} textos sem rótulo em {args.unlabeled}")
+
+    # 1. Rótulos suaves do transformer (reaproveitados se o corpus não mudou)
+    labels_path = soft_labels_path(args.labels_dir, texts, args.transformer_model)
+    if os.path.exists(labels_path):
+        print(f"Usando rótulos suaves em cache ({labels_path})")
+        probabilities = np.load(labels_path)
+    else:
+        print(f"Rotulando com {args.transformer_model}...")
+        transformer = TransformerScorer(args.transformer_model, batch_size=args.batch_size)
+        probabilities = label_corpus(transformer, texts, args.chunksize)
+        os.makedirs(args.labels_dir, exist_ok=True)
+        np.save(labels_path, probabilities)
+        print(f"Rótulos suaves salvos em {labels_path}")
+
+    # 2. Treinar o modelo rápido com os rótulos suaves
+    preprocessor = TextPreprocessor()
+    print("Pré-processando textos...")
+    processed = preprocessor.preprocess_parallel(texts, n_jobs=args.n_jobs)
+
+    rng = np.random.default_rng(42)
+    holdout = rng.random(len(texts)) < args.holdout
+    train_indices = np.flatnonzero(~holdout)
+    holdout_indices = np.flatnonzero(holdout)
+
+    print("Treinando modelo com rótulos suaves...")
+    classifier = SentimentClassifier()
+    classifier.train_soft([processed[i] for i in train_indices],
+                          soften(probabilities[train_indices], args.temperature))
+
+    # Fidelidade: concordância com o transformer em textos fora do treino
+    if len(holdout_indices):
+        predictions = classifier.predict([processed[i] for i in holdout_indices])
+        teacher = probabilities[holdout_indices].argmax(axis=1)
+        print(f"Concordância com o transformer ({len(holdout_indices)} textos reservados): "
+              f"{(predictions == teacher).mean():.4f}")
+
+    # Acurácia em dados rotulados, comparada com o modelo em uso
+    if args.eval_data:
+        data = load_dataset(args.eval_data)
+        eval_processed = preprocessor.preprocess_parallel(data['text'], n_jobs=args.n_jobs)
+        labels = np.asarray(data['sentiment'])
+        print(f"\nAcurácia em {args.eval_data} ({len(data)} textos):")
+        print(f"  destilado:      {(classifier.predict(eval_processed) == labels).mean():.4f}")
+        try:
+            current = ModelRegistry(args.models_dir, fast_inference=False).load()
+            accuracy = (current.classifier.predict(eval_processed) == labels).mean()
+            print(f"  atual ({current.version}): {accuracy:.4f}")
+        except FileNotFoundError:
+            pass
+
+    # 3. Exportar nos artefatos padrão carregados pelo app
+    version = save_versioned(classifier, args.models_dir, make_current=not args.no_activate)
+    status = "salvo" if args.no_activate else "salvo e em uso"
+    print(f"\nModelo destilado {status}: {os.path.join(args.models_dir, version)}/")
+
+
+if __name__ == "__main__":
+    main()
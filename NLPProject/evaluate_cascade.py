@@ -0,0 +1,102 @@
+"""
+Avalia o modo cascata (Naive Bayes primeiro, transformer nos textos de baixa
+confiança) em um dataset rotulado, para diferentes limiares de confiança.
+
+Exemplo:
+    python evaluate_cascade.py --data data/imdb --limit 2000 --thresholds 0.6,0.7,0.8,0.9
+"""
+from utils.cascade import CascadeScorer
+from utils.datasets import load_dataset
+from utils.preprocessing import TextPreprocessor
+from utils.registry import ModelRegistry
+from utils.transformer import DEFAULT_TRANSFORMER, TransformerScorer
+import numpy as np
+import argparse
+import json
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Avalia a classificação em cascata")
+    parser.add_argument('--data', default='data/imdb',
+                        help="diretório no layout do IMDB (pos/neg) ou arquivo CSV")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--label-column', default='sentiment')
+    parser.add_argument('--limit', type=int, default=1000, help="textos avaliados (amostra)")
+    parser.add_argument('--thresholds', default='0.6,0.7,0.8,0.9',
+                        help="limiares de confiança do Naive Bayes")
+    parser.add_argument('--transformer-model', default=DEFAULT_TRANSFORMER)
+    parser.add_argument('--batch-size', type=int, default=32, help="lote do transformer")
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="arquivo JSON com os resultados")
+    return parser.parse_args()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    data = load_dataset(args.data, args.text_column, args.label_column)
+    if len(data) > args.limit:
+        data = data.sample(args.limit, random_state=args.seed)
+    texts = data['text'].tolist()
+    labels = np.asarray(data['sentiment'])
+    print(f"{len(texts)} textos de {args.data}")
+
+    classifier = ModelRegistry(args.models_dir, fast_inference=False).load().classifier
+    preprocessor = TextPreprocessor()
+    transformer = TransformerScorer(args.transformer_model, batch_size=args.batch_size)
+
+    # Aquecer o cache de lemas e o transformer fora das medições
+    preprocessor.preprocess_many(texts)
+    transformer.score(texts[:8])
+
+    def naive_bayes(texts):
+        return classifier.score(preprocessor.preprocess_many(texts))
+
+    (nb_predictions, _, _), nb_time = timed(naive_bayes, texts)
+    (tf_predictions, _, _), tf_time = timed(transformer.score, texts)
+    nb_accuracy = float((nb_predictions == labels).mean())
+    tf_accuracy = float((tf_predictions == labels).mean())
+
+    rows = [
+        {'mode': 'naive_bayes', 'threshold': None, 'escalated': 0.0,
+         'accuracy': nb_accuracy, 'ms_per_text': nb_time / len(texts) * 1000},
+        {'mode': 'transformer', 'threshold': None, 'escalated': 1.0,
+         'accuracy': tf_accuracy, 'ms_per_text': tf_time / len(texts) * 1000}
+    ]
+    for threshold in [float(value) for value in args.thresholds.split(',')]:
+        cascade = CascadeScorer(classifier, transformer, preprocessor, threshold)
+        (predictions, _, _, escalated), elapsed = timed(cascade.score, texts)
+        rows.append({
+            'mode': 'cascade', 'threshold': threshold,
+            'escalated': float(escalated.mean()),
+            'accuracy': float((predictions == labels).mean()),
+            'ms_per_text': elapsed / len(texts) * 1000
+        })
+
+    # Parte do ganho de acurácia do transformer recuperada pela cascata
+    gain = tf_accuracy - nb_accuracy
+    print(f"\n{'modo':<12} {'limiar':>6} {'escalados':>9} {'acurácia':>9} "
+          f"{'ms/texto':>9} {'custo':>7} {'ganho':>7}")
+    for row in rows:
+        row['relative_cost'] = row['ms_per_text'] / rows[1]['ms_per_text']
+        row['gain_recovered'] = (row['accuracy'] - nb_accuracy) / gain if gain else None
+        threshold = f"{row['threshold']:.2f}" if row['threshold'] is not None else '-'
+        recovered = f"{row['gain_recovered']:.0%}" if row['gain_recovered'] is not None else '-'
+        print(f"{row['mode']:<12} {threshold:>6} {row['escalated']:>9.1%} {row['accuracy']:>9.4f} "
+              f"{row['ms_per_text']:>9.2f} {row['relative_cost']:>7.1%} {recovered:>7}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'results': rows}, f, indent=2)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Gerador de carga local para /analyze_sentiment e /vectorize.
+
+Exemplos:
+    # Servidor Flask no mesmo processo, 8 clientes em malha fechada
+    python load_test.py --clients 8 --duration 30
+
+    # Servidor ASGI em subprocesso com 4 workers, chegada aberta a 500 req/s
+    python load_test.py --server asgi --subprocess --workers 4 --arrival open --rate 500
+
+    # Servidor já em execução
+    python load_test.py --url http://127.0.0.1:8000
+"""
+from utils.benchmarking import LENGTH_DISTRIBUTIONS, generate_reviews, summarize
+from urllib.parse import urlparse
+from datetime import datetime
+import http.client
+import subprocess
+import threading
+import argparse
+import logging
+import random
+import socket
+import json
+import time
+import sys
+import os
+
+
+# Payload de cada endpoint exercitado pelo teste
+ENDPOINTS = {
+    'analyze_sentiment': ('/analyze_sentiment', lambda text: {'text': text}),
+    'vectorize': ('/vectorize', lambda text: {'text': text, 'top_k': 20})
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Teste de carga concorrente dos endpoints de sentimento")
+    parser.add_argument('--url', help="servidor já em execução (ex.: http://127.0.0.1:5000)")
+    parser.add_argument('--server', choices=('flask', 'asgi'), default='flask',
+                        help="servidor iniciado pelo teste quando --url não é informado")
+    parser.add_argument('--subprocess', action='store_true',
+                        help="iniciar o servidor em outro processo (evita disputar o GIL com os clientes)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processos do servidor ASGI em subprocesso")
+    parser.add_argument('--keep-cache', action='store_true',
+                        help="manter o cache de resultados do servidor iniciado pelo teste")
+    parser.add_argument('--clients', type=int, default=8, help="clientes concorrentes")
+    parser.add_argument('--arrival', choices=('closed', 'open'), default='closed',
+                        help="malha fechada (próxima requisição após a resposta) ou aberta (taxa fixa)")
+    parser.add_argument('--rate', type=float, default=100,
+                        help="requisições por segundo na chegada aberta (processo de Poisson)")
+    parser.add_argument('--think-ms', type=float, default=0,
+                        help="pausa entre requisições de um cliente na malha fechada")
+    parser.add_argument('--mix', default='analyze_sentiment=0.8,vectorize=0.2',
+                        help="proporção de cada endpoint")
+    parser.add_argument('--duration', type=float, default=10, help="duração em segundos")
+    parser.add_argument('--warmup', type=float, default=1,
+                        help="segundos iniciais fora do resumo final")
+    parser.add_argument('--interval', type=float, default=1, help="intervalo dos relatórios parciais")
+    parser.add_argument('--texts', type=int, default=2000, help="reviews sintéticos distintos")
+    parser.add_argument('--mean-words', type=int, default=150, help="tamanho médio dos reviews")
+    parser.add_argument('--distribution', choices=LENGTH_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--timeout', type=float, default=10, help="timeout de cada requisição")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="arquivo JSON com os resultados")
+    return parser.parse_args()
+
+
+def parse_mix(mix):
+    """
+    Converte 'endpoint=peso,...' em listas de endpoints e pesos
+    """
+    names = []
+    weights = []
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Endpoint desconhecido: {name} (use {', '.join(ENDPOINTS)})")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(host, port, timeout=120, process=None):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Servidor encerrou com código {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request('GET', '/metrics')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Servidor não respondeu em {timeout}s")
+
+
+def warm_up(host, port, text, timeout=120):
+    """
+    Uma requisição por endpoint antes da medição (a primeira carrega o
+    WordNet e os modelos sob demanda)
+    """
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    for path, payload in ENDPOINTS.values():
+        connection.request('POST', path, body=json.dumps(payload(text)),
+                           headers={'Content-Type': 'application/json'})
+        connection.getresponse().read()
+    connection.close()
+
+
+class LocalServer:
+    """
+    Servidor Flask ou ASGI em localhost, no mesmo processo ou em um
+    subprocesso
+    """
+
+    def __init__(self, kind='flask', use_subprocess=False, workers=1, keep_cache=False):
+        self.kind = kind
+        self.use_subprocess = use_subprocess
+        self.workers = workers
+        self.keep_cache = keep_cache
+        self.host = '127.0.0.1'
+        self.port = free_port()
+        self._process = None
+        self._server = None
+
+    def start(self):
+        if not self.keep_cache:
+            os.environ['RESULT_CACHE_SIZE'] = '0'
+
+        if self.use_subprocess:
+            if self.kind == 'flask':
+                command = [sys.executable, '-m', 'flask', '--app', 'app', 'run',
+                           '--host', self.host, '--port', str(self.port), '--with-threads']
+            else:
+                command = [sys.executable, '-m', 'uvicorn', 'serve_async:application',
+                           '--host', self.host, '--port', str(self.port),
+                           '--workers', str(self.workers), '--log-level', 'warning']
+            # O log de cada requisição atrapalharia os relatórios parciais
+            self._process = subprocess.Popen(command, stdout=subprocess.DEVNULL,
+                                             stderr=subprocess.DEVNULL)
+        elif self.kind == 'flask':
+            from werkzeug.serving import make_server
+            import app as service
+
+            logging.getLogger('werkzeug').setLevel(logging.ERROR)
+            self._server = make_server(self.host, self.port, service.app, threaded=True)
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        else:
+            import uvicorn
+            import serve_async
+
+            config = uvicorn.Config(serve_async.application, host=self.host, port=self.port,
+                                    log_level='warning')
+            self._server = uvicorn.Server(config)
+            threading.Thread(target=self._server.run, daemon=True).start()
+
+        wait_until_ready(self.host, self.port, process=self._process)
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+        elif self.kind == 'flask' and self._server is not None:
+            self._server.shutdown()
+        elif self._server is not None:
+            self._server.should_exit = True
+
+
+class LoadGenerator:
+    """
+    Clientes concorrentes em threads, cada um com sua conexão HTTP
+    """
+
+    def __init__(self, host, port, texts, names, weights, clients=8, arrival='closed',
+                 rate=100, think_ms=0, timeout=10, seed=42):
+        self.host = host
+        self.port = port
+        self.texts = texts
+        self.names = names
+        self.weights = weights
+        self.clients = clients
+        self.arrival = arrival
+        self.rate = rate
+        self.think = think_ms / 1000
+        self.timeout = timeout
+        self.seed = seed
+        # (início relativo, latência, endpoint, status ou tipo do erro)
+        self.records = []
+        self._next_arrival = 0.0
+        self._arrival_lock = threading.Lock()
+
+    def _request(self, connection, name, rng):
+        path, payload = ENDPOINTS[name]
+        body = json.dumps(payload(rng.choice(self.texts)))
+        connection.request('POST', path, body=body,
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+    def _next_scheduled(self, rng):
+        # Chegadas de Poisson compartilhadas por todos os clientes
+        with self._arrival_lock:
+            self._next_arrival += rng.expovariate(self.rate)
+            return self._next_arrival
+
+    def _client(self, index, start, end):
+        rng = random.Random(self.seed + index)
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        while True:
+            if self.arrival == 'open':
+                # A latência conta a partir do horário agendado, para que a
+                # espera por um cliente livre também apareça no resultado
+                scheduled = start + self._next_scheduled(rng)
+                if scheduled >= end:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+                if scheduled >= end:
+                    break
+
+            name = rng.choices(self.names, self.weights)[0]
+            try:
+                status = self._request(connection, name, rng)
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                connection.close()
+            self.records.append((scheduled - start, time.perf_counter() - scheduled, name, status))
+
+            if self.arrival == 'closed' and self.think:
+                time.sleep(self.think)
+        connection.close()
+
+    def run(self, duration, interval=1.0, report=None):
+        """
+        Executa a carga por duration segundos, chamando report(janela, registros)
+        a cada intervalo
+        """
+        start = time.perf_counter()
+        end = start + duration
+        threads = [threading.Thread(target=self._client, args=(i, start, end), daemon=True)
+                   for i in range(self.clients)]
+        for thread in threads:
+            thread.start()
+
+        reported = 0
+        window = 0
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(max(start + (window + 1) * interval - time.perf_counter(), 0))
+            if report:
+                records = self.records[reported:]
+                reported += len(records)
+                report(window, records)
+            window += 1
+
+        for thread in threads:
+            thread.join()
+        return self.records
+
+
+def summarize_records(records, elapsed):
+    """
+    Vazão alcançada, percentis de latência e taxa de erros
+    """
+    errors = [status for _, _, _, status in records if status != 200]
+    summary = summarize([latency for _, latency, _, _ in records])
+    summary['rps'] = len(records) / elapsed if elapsed else 0
+    summary['error_rate'] = len(errors) / len(records) if records else 0
+    if errors:
+        summary['errors'] = {str(status): errors.count(status) for status in set(errors)}
+    return summary
+
+
+def format_summary(summary):
+    if not summary.get('n'):
+        return "sem requisições concluídas"
+    return (f"{summary['rps']:8.1f} req/s  p50={summary['p50_ms']:8.2f}ms "
+            f"p95={summary['p95_ms']:8.2f}ms p99={summary['p99_ms']:8.2f}ms "
+            f"erros={summary['error_rate'] * 100:5.1f}%")
+
+
+def main():
+    args = parse_args()
+    names, weights = parse_mix(args.mix)
+    texts = [text for text, _ in generate_reviews(args.texts, args.mean_words,
+                                                   args.distribution, seed=args.seed)]
+
+    server = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = LocalServer(args.server, args.subprocess, args.workers, args.keep_cache).start()
+        host, port = server.host, server.port
+        where = 'subprocesso' if args.subprocess else 'mesmo processo'
+        print(f"Servidor {args.server} em http://{host}:{port} ({where})")
+
+    warm_up(host, port, texts[0])
+
+    arrival = f"aberta a {args.rate:.0f} req/s" if args.arrival == 'open' else 'fechada'
+    print(f"{args.clients} clientes, chegada {arrival}, mix {args.mix}, {args.duration:.0f}s\n")
+
+    timeline = []
+
+    def report(window, records):
+        summary = summarize_records(records, args.interval)
+        timeline.append({'window': window, **summary})
+        print(f"[{(window + 1) * args.interval:6.1f}s] {format_summary(summary)}")
+
+    generator = LoadGenerator(host, port, texts, names, weights, args.clients, args.arrival,
+                              args.rate, args.think_ms, args.timeout, args.seed)
+    try:
+        records = generator.run(args.duration, args.interval, report)
+    finally:
+        if server is not None:
+            server.stop()
+
+    # Resumo final sem o aquecimento
+    measured = [record for record in records if record[0] >= args.warmup]
+    elapsed = max(args.duration - args.warmup, 1e-9)
+    results = {'total': summarize_records(measured, elapsed)}
+    for name in names:
+        results[name] = summarize_records([r for r in measured if r[2] == name], elapsed)
+
+    print(f"\nResumo (após {args.warmup:.0f}s de aquecimento):")
+    for name, summary in results.items():
+        print(f"{name:>18}: {format_summary(summary)}")
+        for status, count in summary.get('errors', {}).items():
+            print(f"{'':>20}{status}: {count}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {'timestamp': datetime.now().isoformat(timespec='seconds'),
+                         'args': vars(args)},
+                'results': results,
+                'timeline': timeline
+            }, f, indent=2)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Classificação em massa de arquivos CSV, JSONL ou Parquet com o modelo em models/.
+
+Exemplo:
+    python score_file.py reviews.csv reviews_scored.csv --n-jobs 4
+
+Cada bloco classificado é gravado em <saída>.parts/; se a execução for
+interrompida, basta repetir o comando para continuar do último bloco
+concluído. Ao final as partes são unidas no arquivo de saída.
+"""
+from utils.preprocessing import TextPreprocessor, ensure_nltk_resources, mark_nltk_resources_checked
+from utils.registry import ModelRegistry, load_classifier_from_dir
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+import pandas as pd
+import numpy as np
+import argparse
+import shutil
+import json
+import time
+import io
+import os
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Classifica textos de um arquivo CSV/JSONL/Parquet em blocos")
+    parser.add_argument('input', help="arquivo de entrada (.csv, .jsonl ou .parquet)")
+    parser.add_argument('output', help="arquivo de saída (.csv ou .parquet)")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--keep-columns',
+                        help="colunas da entrada copiadas para a saída (padrão: todas)")
+    parser.add_argument('--chunksize', type=int, default=10000, help="linhas por bloco")
+    parser.add_argument('--n-jobs', type=int, default=None,
+                        help="processos para pré-processar e classificar")
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--model-version', help="versão do modelo (padrão: a atual)")
+    parser.add_argument('--restart', action='store_true',
+                        help="descartar o progresso anterior e começar do zero")
+    return parser.parse_args()
+
+
+def file_format(path):
+    if path.endswith('.parquet'):
+        return 'parquet'
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+
+def count_rows(path):
+    """
+    Total de linhas quando é barato obter (metadados do Parquet)
+    """
+    if file_format(path) != 'parquet':
+        return None
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def _iter_parquet(path, chunksize, skip_rows):
+    # pyarrow é necessário apenas para arquivos Parquet
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(path)
+
+    # Grupos de linhas inteiramente concluídos não são lidos
+    row_groups = []
+    for group in range(parquet.num_row_groups):
+        size = parquet.metadata.row_group(group).num_rows
+        if row_groups or skip_rows < size:
+            row_groups.append(group)
+        else:
+            skip_rows -= size
+    if not row_groups:
+        return
+
+    for batch in parquet.iter_batches(batch_size=chunksize, row_groups=row_groups):
+        if skip_rows >= len(batch):
+            skip_rows -= len(batch)
+            continue
+        yield batch.slice(skip_rows).to_pandas()
+        skip_rows = 0
+
+
+def iter_chunks(path, chunksize, skip_rows=0):
+    """
+    Lê o arquivo de entrada em DataFrames de até chunksize linhas, pulando as
+    skip_rows primeiras sem convertê-las
+    """
+    if os.path.getsize(path) == 0:
+        return
+    input_format = file_format(path)
+    if input_format == 'parquet':
+        yield from _iter_parquet(path, chunksize, skip_rows)
+        return
+
+    if input_format == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            # Linhas concluídas são descartadas antes do parse do JSON
+            lines = islice((line for line in f if line.strip()), skip_rows, None)
+            while True:
+                block = list(islice(lines, chunksize))
+                if not block:
+                    return
+                yield pd.read_json(io.StringIO(''.join(block)), lines=True)
+
+    # Linhas puladas pelo tokenizador, sem conversão nem classificação
+    skip = range(1, skip_rows + 1) if skip_rows else None
+    with pd.read_csv(path, chunksize=chunksize, skiprows=skip) as reader:
+        for chunk in reader:
+            if len(chunk):
+                yield chunk
+
+
+def empty_frame(path, keep_columns=None):
+    """
+    DataFrame sem linhas com as colunas da entrada, para que uma entrada
+    vazia ainda gere uma saída com cabeçalho
+    """
+    input_format = file_format(path)
+    if keep_columns is not None or input_format == 'jsonl' or os.path.getsize(path) == 0:
+        return pd.DataFrame(columns=keep_columns or [])
+    if input_format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).schema_arrow.empty_table().to_pandas()
+    return pd.read_csv(path, nrows=0)
+
+
+# Modelo e preprocessador de cada processo do pool
+_worker_model = None
+
+
+def _init_worker(model_path, resources_checked=False):
+    global _worker_model
+    if resources_checked:
+        mark_nltk_resources_checked()
+    _worker_model = (load_classifier_from_dir(model_path), TextPreprocessor())
+
+
+def _score_texts(texts, model=None):
+    classifier, preprocessor = model or _worker_model
+    predictions, _, confidences = classifier.score(preprocessor.preprocess_many(texts))
+    return predictions, confidences
+
+
+class ScoringJob:
+    """
+    Progresso de uma execução: partes concluídas em <saída>.parts/ e um
+    progress.json que identifica entrada, parâmetros e modelo
+    """
+
+    def __init__(self, output, settings):
+        self.output = output
+        self.parts_dir = f'{output}.parts'
+        self.progress_path = os.path.join(self.parts_dir, 'progress.json')
+        self.settings = settings
+        self.extension = 'parquet' if file_format(output) == 'parquet' else 'csv'
+        self.completed = 0
+        self.rows = 0
+
+    def open(self, restart=False):
+        """
+        Retoma o progresso compatível ou começa do zero
+        """
+        if restart:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+
+        if os.path.exists(self.progress_path):
+            with open(self.progress_path) as f:
+                progress = json.load(f)
+            if progress['settings'] != self.settings:
+                raise SystemExit(
+                    f"O progresso em {self.parts_dir} é de outra entrada, modelo ou "
+                    f"configuração; use --restart para descartá-lo")
+            self.completed = progress['completed']
+            self.rows = progress['rows']
+        else:
+            os.makedirs(self.parts_dir, exist_ok=True)
+            self._save_progress()
+        return self
+
+    def part_path(self, index):
+        return os.path.join(self.parts_dir, f'part-{index:06d}.{self.extension}')
+
+    def _save_progress(self):
+        tmp_path = f'{self.progress_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'settings': self.settings, 'completed': self.completed,
+                       'rows': self.rows}, f, indent=2)
+        os.replace(tmp_path, self.progress_path)
+
+    def write_part(self, index, data):
+        """
+        Grava a parte de forma atômica e só então a marca como concluída
+        """
+        path = self.part_path(index)
+        tmp_path = f'{path}.tmp'
+        if self.extension == 'parquet':
+            data.to_parquet(tmp_path, index=False)
+        else:
+            data.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        self.completed = index + 1
+        self.rows += len(data)
+        self._save_progress()
+
+    def finish(self):
+        """
+        Une as partes no arquivo de saída e remove o diretório de progresso
+        """
+        tmp_path = f'{self.output}.tmp'
+        paths = [self.part_path(index) for index in range(self.completed)]
+        if self.extension == 'parquet':
+            import pyarrow.parquet as pq
+            writer = None
+            for path in paths:
+                table = pq.read_table(path)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+            if writer is not None:
+                writer.close()
+        else:
+            with open(tmp_path, 'wb') as output:
+                for position, path in enumerate(paths):
+                    with open(path, 'rb') as part:
+                        # Manter apenas o cabeçalho da primeira parte
+                        if position:
+                            part.readline()
+                        shutil.copyfileobj(part, output)
+        if paths:
+            os.replace(tmp_path, self.output)
+        shutil.rmtree(self.parts_dir)
+
+
+def add_scores(data, keep_columns, predictions, confidences):
+    output = data if keep_columns is None else data[keep_columns].copy()
+    output['prediction'] = predictions
+    output['confidence'] = confidences
+    return output
+
+
+def main():
+    args = parse_args()
+    keep_columns = args.keep_columns.split(',') if args.keep_columns else None
+
+    # Todos os processos usam a mesma versão do modelo
+    version, model_path = ModelRegistry(args.models_dir).resolve(args.model_version)
+    classifier = load_classifier_from_dir(model_path)
+    version = version or classifier.version
+    print(f"Modelo {version} ({model_path})")
+
+    stat = os.stat(args.input)
+    job = ScoringJob(args.output, {
+        'input': os.path.abspath(args.input),
+        'input_size': stat.st_size,
+        'input_mtime_ns': stat.st_mtime_ns,
+        'text_column': args.text_column,
+        'keep_columns': keep_columns,
+        'chunksize': args.chunksize,
+        'model_version': version
+    }).open(args.restart)
+    if job.completed:
+        print(f"Retomando após {job.completed} blocos ({job.rows} linhas) concluídos")
+
+    total_rows = count_rows(args.input)
+    n_jobs = args.n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        # Reaproveita o modelo já carregado acima
+        local_model = (classifier, TextPreprocessor())
+        pool = None
+    else:
+        # Recursos do NLTK verificados uma vez aqui, e não em cada processo
+        ensure_nltk_resources()
+        pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                   initargs=(model_path, True))
+
+    start = time.perf_counter()
+    rows = 0
+
+    def write(index, data, result):
+        nonlocal rows
+        output = add_scores(data, keep_columns, *result)
+        job.write_part(index, output)
+
+        rows += len(output)
+        elapsed = time.perf_counter() - start
+        remaining = ''
+        if total_rows and rows:
+            eta = max(total_rows - job.rows, 0) / (rows / elapsed)
+            remaining = f", {min(job.rows, total_rows)}/{total_rows} linhas, faltam ~{eta:.0f}s"
+        print(f"[bloco {index}] {rows} linhas em {elapsed:.1f}s "
+              f"({rows / elapsed:.0f} linhas/s){remaining}")
+
+    # Poucos blocos em andamento por vez mantêm a memória limitada
+    pending = deque()
+    try:
+        # Linhas de blocos já concluídos são puladas na leitura
+        chunks = iter_chunks(args.input, args.chunksize, job.rows)
+        for index, data in enumerate(chunks, start=job.completed):
+            texts = data[args.text_column].fillna('').astype(str).tolist()
+            if pool is None:
+                write(index, data, _score_texts(texts, local_model))
+                continue
+
+            pending.append((index, data, pool.submit(_score_texts, texts)))
+            while len(pending) >= 2 * n_jobs:
+                index, data, future = pending.popleft()
+                write(index, data, future.result())
+
+        # Os blocos são gravados na ordem da entrada
+        while pending:
+            index, data, future = pending.popleft()
+            write(index, data, future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if not job.completed:
+        # Entrada sem linhas: a saída tem apenas o cabeçalho
+        job.write_part(0, add_scores(empty_frame(args.input, keep_columns), keep_columns,
+                                     np.empty(0, dtype=np.int64), np.empty(0)))
+    job.finish()
+    elapsed = time.perf_counter() - start
+    print(f"\nConcluído: {rows} linhas classificadas em {elapsed:.1f}s "
+          f"({rows / elapsed if elapsed else 0:.0f} linhas/s). Saída em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Modo de serviço assíncrono (ASGI) com micro-lotes para /analyze_sentiment.
+
+Executar com:
+    python serve_async.py
+ou
+    uvicorn serve_async:application --host 0.0.0.0 --port 8000
+"""
+from utils.batching import MicroBatcher, QueueFullError
+from utils import metrics
+import app as service
+import asyncio
+import json
+import time
+import os
+
+# Configuração dos micro-lotes e do limite de latência
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 64))
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 5))
+BATCH_QUEUE_SIZE = int(os.environ.get('BATCH_QUEUE_SIZE', 10000))
+REQUEST_TIMEOUT_MS = float(os.environ.get('REQUEST_TIMEOUT_MS', 1000))
+# Tamanho máximo do corpo da requisição (os endpoints recebem um único texto)
+MAX_BODY_BYTES = int(os.environ.get('MAX_BODY_BYTES', 1024 * 1024))
+
+batcher = MicroBatcher(
+    service.analyze_texts,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    max_queue_size=BATCH_QUEUE_SIZE
+)
+
+
+class RequestTooLarge(Exception):
+    """
+    Corpo da requisição maior que MAX_BODY_BYTES
+    """
+
+
+async def read_json(receive, headers=()):
+    # Recusar pelo Content-Length antes de ler e, sem ele, durante a leitura
+    for name, value in headers:
+        if name.lower() == b'content-length' and value.isdigit() and int(value) > MAX_BODY_BYTES:
+            raise RequestTooLarge()
+
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise RequestTooLarge()
+        chunks.append(chunk)
+        more_body = message.get('more_body', False)
+    return json.loads(b''.join(chunks) or b'{}')
+
+
+async def send_body(send, body, content_type, status=200):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type.encode()),
+            (b'content-length', str(len(body)).encode())
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, payload, status=200):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await send_body(send, body, 'application/json', status)
+
+
+async def analyze_sentiment(data):
+    text = data.get('text')
+    if not text:
+        return {'error': 'Nenhum texto fornecido'}, 400
+    # Validar antes de entrar no lote: um item inválido não afeta os demais
+    if not isinstance(text, str):
+        return {'error': 'O campo text deve ser uma string'}, 400
+    if not service.registry.current:
+        return {'error': 'Modelo não carregado'}, 500
+
+    # Aguardar o resultado do micro-lote dentro do limite de latência
+    try:
+        result = await asyncio.wait_for(batcher.submit(text), REQUEST_TIMEOUT_MS / 1000)
+    except (asyncio.TimeoutError, QueueFullError):
+        return {'error': 'Servidor sobrecarregado, tente novamente'}, 503
+
+    return {'text': text, **result}, 200
+
+
+async def vectorize(data):
+    text = data.get('text')
+    if not text:
+        return {'error': 'Nenhum texto fornecido'}, 400
+
+    top_k = data.get('top_k')
+    output_format = data.get('format', 'terms')
+    error = service.validate_vectorize_options(top_k, output_format)
+    if error:
+        return {'error': error}, 400
+    bundle = service.registry.current
+    if not bundle:
+        return {'error': 'Modelo não carregado'}, 500
+
+    # Vetorização individual fora do loop de eventos
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        None, service.vectorize_text, text, top_k, output_format, bundle)
+    return {'text': text, **result}, 200
+
+
+ROUTES = {
+    '/analyze_sentiment': analyze_sentiment,
+    '/vectorize': vectorize
+}
+
+
+def warm_up():
+    """
+    Carrega os recursos do NLTK e o modelo antes da primeira requisição,
+    para que ela não estoure o limite de latência
+    """
+    if service.registry.current:
+        service.analyze_texts(['warm up'])
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await asyncio.get_running_loop().run_in_executor(None, warm_up)
+            batcher.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await batcher.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    if scope['path'] == '/metrics' and scope['method'] == 'GET':
+        body = metrics.REGISTRY.render().encode('utf-8')
+        return await send_body(send, body, metrics.CONTENT_TYPE)
+
+    start = time.perf_counter()
+    handler = ROUTES.get(scope['path'])
+    if handler is None:
+        payload, status = {'error': 'Rota não encontrada'}, 404
+    elif scope['method'] != 'POST':
+        payload, status = {'error': 'Método não permitido'}, 405
+    else:
+        try:
+            data = await read_json(receive, scope.get('headers', ()))
+            payload, status = await handler(data)
+        except RequestTooLarge:
+            payload, status = {'error': f'Requisição maior que {MAX_BODY_BYTES} bytes'}, 413
+        except Exception as e:
+            payload, status = {'error': str(e)}, 500
+
+    await send_json(send, payload, status)
+    endpoint = scope['path'].strip('/') if handler else 'desconhecido'
+    metrics.observe_request(endpoint, status, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(application, host=os.environ.get('HOST', '127.0.0.1'),
+                port=int(os.environ.get('PORT', 8000)))
@@ -1,20 +1,37 @@
 from utils.preprocessing import TextPreprocessor
 from utils.training import SentimentClassifier
+from utils.registry import save_versioned
+from utils.datasets import has_dataset, load_processed_dataset
+from utils.compaction import compact_model, compaction_report, print_compaction_report
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
+import argparse
 import os
 
 
-def main():
-    # Criar diretórios necessários
-    os.makedirs('models', exist_ok=True)
-    os.makedirs('data/imdb', exist_ok=True)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Treina o modelo de sentimentos")
+    parser.add_argument('--data', default='data/imdb',
+                        help="diretório no layout do IMDB (pos/neg) ou arquivo CSV")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--label-column', default='sentiment')
+    parser.add_argument('--cache-dir', default='data/cache',
+                        help="diretório dos textos pré-processados em cache")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="refazer o pré-processamento sem usar o cache")
+    parser.add_argument('--n-jobs', type=int, default=None,
+                        help="processos para o pré-processamento")
+    parser.add_argument('--compact', action='store_true',
+                        help="salvar o modelo compacto (float32 e vocabulário podado)")
+    parser.add_argument('--prune-threshold', type=float, default=0.05,
+                        help="spread mínimo de log-probabilidade entre classes para manter um termo")
+    return parser.parse_args()
 
-    # Carregar e preparar dados
-    print("Carregando dados...")
+
+def sample_data():
     # Dataset de exemplo mais robusto e balanceado
-    data = pd.DataFrame({
+    return pd.DataFrame({
         'text': [
             # Reviews positivos
             "This movie was excellent! Great performance by all actors.",
@@ -47,10 +64,33 @@ def main():
         ]
     })
 
-    # Pré-processar textos
-    print("Pré-processando textos...")
+
+def main():
+    args = parse_args()
+
+    # Criar diretórios necessários
+    os.makedirs('models', exist_ok=True)
+    os.makedirs('data/imdb', exist_ok=True)
+
+    # Carregar e preparar dados
+    print("Carregando dados...")
     preprocessor = TextPreprocessor()
-    data['processed_text'] = data['text'].apply(preprocessor.preprocess)
+
+    if has_dataset(args.data):
+        # Dataset real, com os textos pré-processados reaproveitados do cache
+        data = load_processed_dataset(
+            args.data, preprocessor, cache_dir=args.cache_dir, n_jobs=args.n_jobs,
+            text_column=args.text_column, label_column=args.label_column,
+            use_cache=not args.no_cache
+        )
+    else:
+        print(f"Nenhum dado encontrado em {args.data}, usando dataset de exemplo")
+        data = sample_data()
+
+        # Pré-processar textos
+        print("Pré-processando textos...")
+        data['processed_text'] = preprocessor.preprocess_parallel(data['text'],
+                                                                  n_jobs=args.n_jobs)
 
     # Dividir dados em treino e teste
     X_train, X_test, y_train, y_test = train_test_split(
@@ -72,14 +112,18 @@ def main():
     print("\nRelatório de Classificação:")
     print(classification_report(y_test, predictions, zero_division=1))
 
+    # Compactar modelo
+    if args.compact:
+        print("\nCompactando modelo...")
+        compact = compact_model(classifier, prune_threshold=args.prune_threshold)
+        print_compaction_report(compaction_report(classifier, compact, X_test, y_test))
+        classifier = compact
+
     # Salvar modelo
     print("\nSalvando modelo...")
-    classifier.save_model(
-        'models/vectorizer.pkl',
-        'models/classifier.pkl'
-    )
+    version = save_versioned(classifier, 'models')
 
-    print("Treinamento concluído! Modelo salvo em /models/")
+    print(f"Treinamento concluído! Modelo salvo em /models/{version}/")
 
     # Teste com algumas frases novas
     print("\nTestando modelo com algumas frases novas:")
@@ -91,10 +135,9 @@ def main():
 
     for phrase in test_phrases:
         processed = preprocessor.preprocess(phrase)
-        prediction = classifier.predict([processed])[0]
-        proba = classifier.predict_proba([processed])[0]
-        sentiment = "positivo" if prediction == 1 else "negativo"
-        confidence = max(proba)
+        predictions, _, confidences = classifier.score([processed])
+        sentiment = "positivo" if predictions[0] == 1 else "negativo"
+        confidence = confidences[0]
         print(f"\nFrase: {phrase}")
         print(f"Sentimento: {sentiment}")
         print(f"Confiança: {confidence:.2f}")
@@ -0,0 +1,65 @@
+from utils.streaming import StreamingTrainer, iter_text_chunks, peak_memory_mb
+from utils.datasets import ProcessedShardCache, dataset_fingerprint
+from utils.registry import save_versioned
+import argparse
+import time
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Treina o modelo de sentimentos em blocos a partir de CSV/JSONL")
+    parser.add_argument('path', help="arquivo CSV ou JSONL com os textos rotulados")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--label-column', default='sentiment')
+    parser.add_argument('--chunksize', type=int, default=10000,
+                        help="linhas lidas por bloco")
+    parser.add_argument('--n-features', type=int, default=2 ** 20,
+                        help="dimensão do espaço de hashing")
+    parser.add_argument('--no-idf', action='store_true',
+                        help="usar apenas TF (uma única passada sobre os dados)")
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help="processos para o pré-processamento")
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--cache-dir', default='data/cache',
+                        help="shards com os textos pré-processados (relidos na 2ª passada)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="não gravar shards; com idf, pré-processa os dados duas vezes")
+    args = parser.parse_args()
+
+    def chunks():
+        return iter_text_chunks(args.path, args.text_column, args.label_column,
+                                args.chunksize)
+
+    print("Treinando modelo em blocos...")
+    start = time.perf_counter()
+    trainer = StreamingTrainer(n_features=args.n_features, use_idf=not args.no_idf,
+                               n_jobs=args.n_jobs)
+
+    # Shards identificados pelo dataset e pela versão do preprocessador
+    cache = cache_path = metadata = None
+    if not args.no_cache:
+        cache = ProcessedShardCache(args.cache_dir)
+        dataset_key = dataset_fingerprint(args.path, args.text_column, args.label_column)
+        preprocessor_key = trainer.preprocessor.fingerprint()
+        cache_path = cache.path_for(dataset_key, preprocessor_key)
+        metadata = {'source': os.path.abspath(args.path), 'dataset': dataset_key,
+                    'preprocessor': preprocessor_key,
+                    'preprocessor_version': trainer.preprocessor.VERSION}
+        os.makedirs(args.cache_dir, exist_ok=True)
+        if cache.is_complete(cache_path):
+            print(f"Usando textos pré-processados em cache ({cache_path})")
+    trainer.fit(chunks, cache, cache_path, metadata)
+
+    print("\nSalvando modelo...")
+    version = save_versioned(trainer.to_sentiment_classifier(), args.models_dir)
+
+    print(f"Treinamento concluído em {time.perf_counter() - start:.1f}s! "
+          f"Modelo salvo em {os.path.join(args.models_dir, version)}/")
+    memory = peak_memory_mb()
+    if memory is not None:
+        print(f"Pico de memória: {memory:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
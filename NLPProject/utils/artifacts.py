@@ -0,0 +1,253 @@
+from collections.abc import Mapping
+from sklearn.feature_extraction.text import TfidfVectorizer, TfidfTransformer
+from sklearn.naive_bayes import MultinomialNB
+import numpy as np
+import scipy.sparse as sp
+import hashlib
+import json
+import os
+import struct
+
+
+# Formato do artefato:
+#   [magic (8 bytes)][versão do formato (uint32)][tamanho do cabeçalho (uint32)]
+#   [cabeçalho JSON][arrays alinhados em 64 bytes]
+# O cabeçalho descreve o dtype, o shape e o offset de cada array, e guarda o
+# SHA-256 da região de dados para verificação na carga.
+ARTIFACT_MAGIC = b'NLPSENT\0'
+ARTIFACT_FORMAT_VERSION = 1
+ARTIFACT_ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sII')
+
+# Parâmetros do TfidfVectorizer necessários para reconstruir o transform
+VECTORIZER_PARAMS = (
+    'input', 'encoding', 'decode_error', 'strip_accents', 'lowercase',
+    'token_pattern', 'stop_words', 'ngram_range', 'analyzer', 'max_df',
+    'min_df', 'max_features', 'binary', 'norm', 'use_idf', 'smooth_idf',
+    'sublinear_tf'
+)
+
+
+class ArrayVocabulary(Mapping):
+    """
+    Vocabulário termo -> índice apoiado em arrays ordenados (compatível com
+    vocabulary_ do TfidfVectorizer), sem manter um dicionário Python. Na
+    vetorização, os tokens de cada documento são buscados de uma vez com
+    lookup_many (um único np.searchsorted sobre os arrays mapeados)
+    """
+
+    def __init__(self, terms, indices):
+        # terms: array de bytes (dtype 'S') ordenado; indices: coluna de cada termo
+        self.terms = terms
+        self.indices = indices
+
+    @classmethod
+    def from_dict(cls, vocabulary):
+        encoded = sorted((term.encode('utf-8'), index)
+                         for term, index in vocabulary.items())
+        width = max((len(term) for term, _ in encoded), default=1)
+        terms = np.array([term for term, _ in encoded], dtype=f'S{width}')
+        indices = np.array([index for _, index in encoded], dtype=np.int32)
+        return cls(terms, indices)
+
+    def lookup_many(self, tokens):
+        """
+        Coluna de cada token (-1 para tokens fora do vocabulário)
+        """
+        if not len(tokens) or not len(self.terms):
+            return np.full(len(tokens), -1, dtype=np.intp)
+
+        keys = np.array([token.encode('utf-8') for token in tokens])
+        # Tokens maiores que o maior termo nunca estão no vocabulário (e seriam
+        # truncados na conversão para a largura dos termos)
+        fits = np.char.str_len(keys) <= self.terms.dtype.itemsize
+        keys = keys.astype(self.terms.dtype)
+
+        positions = np.searchsorted(self.terms, keys)
+        np.minimum(positions, len(self.terms) - 1, out=positions)
+        found = fits & (self.terms[positions] == keys)
+        return np.where(found, self.indices[positions], -1).astype(np.intp)
+
+    def __getitem__(self, term):
+        index = int(self.lookup_many([term])[0])
+        if index < 0:
+            raise KeyError(term)
+        return index
+
+    def __iter__(self):
+        return (term.decode('utf-8') for term in self.terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+
+class ArrayTfidfVectorizer(TfidfVectorizer):
+    """
+    TfidfVectorizer que, com um ArrayVocabulary, conta os termos buscando
+    todos os tokens de cada documento de uma vez (em vez de um acesso ao
+    vocabulário por token, como faz o scikit-learn)
+    """
+
+    def _count_vocab(self, raw_documents, fixed_vocab):
+        if not fixed_vocab or not isinstance(self.vocabulary_, ArrayVocabulary):
+            return super()._count_vocab(raw_documents, fixed_vocab)
+
+        analyze = self.build_analyzer()
+        columns = []
+        indptr = [0]
+        for document in raw_documents:
+            document_columns = self.vocabulary_.lookup_many(analyze(document))
+            document_columns = document_columns[document_columns >= 0]
+            columns.append(document_columns)
+            indptr.append(indptr[-1] + len(document_columns))
+
+        columns = np.concatenate(columns) if columns else np.empty(0, dtype=np.intp)
+        X = sp.csr_matrix(
+            (np.ones(len(columns), dtype=self.dtype), columns, np.asarray(indptr)),
+            shape=(len(indptr) - 1, len(self.vocabulary_)), dtype=self.dtype
+        )
+        # Soma tokens repetidos e ordena os índices, como o scikit-learn
+        X.sum_duplicates()
+        return self.vocabulary_, X
+
+
+def vectorizer_params(vectorizer):
+    """
+    Parâmetros do TfidfVectorizer serializáveis no cabeçalho do artefato
+    """
+    if not isinstance(vectorizer, TfidfVectorizer):
+        raise ValueError("O formato mapeável exige um TfidfVectorizer")
+    if vectorizer.preprocessor is not None or vectorizer.tokenizer is not None:
+        raise ValueError("Pré-processador ou tokenizador customizado não é suportado")
+    if callable(vectorizer.analyzer):
+        raise ValueError("Analisador customizado não é suportado")
+
+    params = vectorizer.get_params()
+    params = {name: params[name] for name in VECTORIZER_PARAMS}
+    if params['stop_words'] is not None and not isinstance(params['stop_words'], str):
+        params['stop_words'] = sorted(params['stop_words'])
+    params['ngram_range'] = list(params['ngram_range'])
+    return params
+
+
+def _align(offset):
+    return (offset + ARTIFACT_ALIGNMENT - 1) // ARTIFACT_ALIGNMENT * ARTIFACT_ALIGNMENT
+
+
+def save_artifact(vectorizer, classifier, path):
+    """
+    Salva vetorizador TF-IDF e MultinomialNB como arrays planos mapeáveis
+    """
+    params = vectorizer_params(vectorizer)
+    vocabulary = vectorizer.vocabulary_
+    if not isinstance(vocabulary, ArrayVocabulary):
+        vocabulary = ArrayVocabulary.from_dict(vocabulary)
+
+    arrays = {
+        'terms': vocabulary.terms,
+        'term_indices': np.asarray(vocabulary.indices, dtype=np.int32),
+        'feature_log_prob': np.asarray(classifier.feature_log_prob_),
+        'class_log_prior': np.asarray(classifier.class_log_prior_)
+    }
+    if vectorizer.use_idf:
+        arrays['idf'] = np.asarray(vectorizer.idf_)
+
+    # Montar a região de dados com cada array alinhado
+    layout = {}
+    chunks = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        padding = _align(offset) - offset
+        chunks.append(b'\0' * padding)
+        offset += padding
+        layout[name] = {
+            'offset': offset,
+            'dtype': array.dtype.str,
+            'shape': list(array.shape)
+        }
+        data = array.tobytes()
+        chunks.append(data)
+        offset += len(data)
+    data = b''.join(chunks)
+
+    header = {
+        'vectorizer_params': params,
+        'classes': classifier.classes_.tolist(),
+        'arrays': layout,
+        'checksum': hashlib.sha256(data).hexdigest()
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+
+    # A região de dados começa alinhada logo após o cabeçalho
+    data_offset = _align(_PREAMBLE.size + len(header_bytes))
+    header_bytes = header_bytes.ljust(data_offset - _PREAMBLE.size, b' ')
+
+    # Escrever em arquivo temporário e renomear de forma atômica
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(ARTIFACT_MAGIC, ARTIFACT_FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(data)
+    os.replace(tmp_path, path)
+    return header['checksum']
+
+
+def load_artifact(path, verify=True):
+    """
+    Carrega o artefato via np.memmap; os arrays são compartilhados entre
+    processos pelo cache de páginas do sistema operacional
+    """
+    buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    magic, format_version, header_size = _PREAMBLE.unpack(bytes(buffer[:_PREAMBLE.size]))
+    if magic != ARTIFACT_MAGIC:
+        raise ValueError(f"{path} não é um artefato de modelo válido")
+    if format_version != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Versão de formato não suportada: {format_version}")
+
+    data_offset = _PREAMBLE.size + header_size
+    header = json.loads(bytes(buffer[_PREAMBLE.size:data_offset]))
+    data = buffer[data_offset:]
+
+    if verify and hashlib.sha256(data).hexdigest() != header['checksum']:
+        raise ValueError(f"Checksum inválido para {path}")
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape']))
+        start = spec['offset']
+        arrays[name] = data[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+
+    vectorizer, classifier = build_model(header['vectorizer_params'], header['classes'], arrays)
+    return vectorizer, classifier, header
+
+
+def build_model(params, classes, arrays):
+    """
+    Reconstrói o TfidfVectorizer e o MultinomialNB a partir dos parâmetros
+    e dos arrays do artefato, sem copiá-los
+    """
+    # Reconstruir o vetorizador sobre os arrays
+    params = dict(params)
+    params['ngram_range'] = tuple(params['ngram_range'])
+    vectorizer = ArrayTfidfVectorizer(**params)
+    vectorizer.vocabulary_ = ArrayVocabulary(arrays['terms'], arrays['term_indices'])
+    n_features = len(vectorizer.vocabulary_)
+
+    tfidf = TfidfTransformer(norm=vectorizer.norm, use_idf=vectorizer.use_idf,
+                             smooth_idf=vectorizer.smooth_idf,
+                             sublinear_tf=vectorizer.sublinear_tf)
+    if vectorizer.use_idf:
+        tfidf.idf_ = arrays['idf']
+    tfidf.n_features_in_ = n_features
+    vectorizer._tfidf = tfidf
+
+    # Reconstruir o classificador com os parâmetros
+    classifier = MultinomialNB()
+    classifier.classes_ = np.array(classes)
+    classifier.feature_log_prob_ = arrays['feature_log_prob']
+    classifier.class_log_prior_ = arrays['class_log_prior']
+    classifier.n_features_in_ = n_features
+
+    return vectorizer, classifier
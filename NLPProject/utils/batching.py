@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
+
+
+class QueueFullError(Exception):
+    """
+    Fila de micro-lotes cheia: a requisição deve ser rejeitada
+    """
+
+
+class MicroBatcher:
+    """
+    Agrupa chamadas concorrentes em micro-lotes limitados por tamanho e por
+    tempo de espera, processando cada lote com uma única chamada a score_fn
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=5, max_queue_size=10000):
+        # score_fn recebe uma lista de itens e retorna uma lista de resultados
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+        self._queue = None
+        self._worker = None
+        # Uma única thread: o modelo é limitado pela GIL e os lotes crescem
+        # naturalmente enquanto o lote anterior é processado
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.items = 0
+
+    def start(self):
+        """
+        Inicia a tarefa de processamento no loop de eventos atual
+        """
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, item):
+        """
+        Enfileira um item e aguarda o resultado do seu lote
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            raise QueueFullError("Fila de requisições cheia")
+        return await future
+
+    async def _collect(self):
+        # Esperar o primeiro item e completar o lote até o tamanho ou prazo máximos
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+
+            # Ignorar requisições que já desistiram (timeout do cliente)
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.score_fn, items)
+            except Exception as e:
+                if len(batch) == 1:
+                    if not batch[0][1].done():
+                        batch[0][1].set_exception(e)
+                    continue
+                # Um item com problema não deve derrubar o lote inteiro:
+                # repetir item a item para isolar a falha
+                await self._run_individually(loop, batch)
+                continue
+
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _run_individually(self, loop, batch):
+        for item, future in batch:
+            if future.done():
+                continue
+            try:
+                result = (await loop.run_in_executor(self._executor, self.score_fn, [item]))[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += 1
+            if not future.done():
+                future.set_result(result)
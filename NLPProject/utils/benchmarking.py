@@ -0,0 +1,101 @@
+import numpy as np
+import random
+import time
+
+
+# Vocabulário usado pelo gerador de reviews sintéticos
+POSITIVE_WORDS = ['great', 'excellent', 'amazing', 'wonderful', 'brilliant', 'fantastic',
+                  'enjoyable', 'masterpiece', 'loved', 'beautiful', 'perfect', 'superb']
+NEGATIVE_WORDS = ['terrible', 'awful', 'boring', 'waste', 'poor', 'worst', 'disappointing',
+                  'horrible', 'dull', 'mess', 'stupid', 'painful']
+NEUTRAL_WORDS = ['movie', 'film', 'plot', 'actors', 'scenes', 'story', 'director', 'cast',
+                 'characters', 'ending', 'music', 'camera', 'dialogue', 'performances',
+                 'minutes', 'watching', 'thought', 'really', 'series', 'season']
+FILLER_WORDS = ['the', 'a', 'and', 'was', 'is', 'of', 'to', 'it', 'this', 'that', 'with',
+                'but', 'for', 'I', 'in', 'on', 'very', 'not', 'so', 'all']
+NOISE = ['<br />', '!', '...', '10/10', "didn't", '(spoilers)', '2', '?']
+
+LENGTH_DISTRIBUTIONS = ('lognormal', 'uniform', 'fixed')
+
+
+def sample_length(rng, mean_words, distribution='lognormal'):
+    """
+    Sorteia o número de palavras de um review
+    """
+    if distribution == 'fixed':
+        return mean_words
+    if distribution == 'uniform':
+        return rng.randint(1, 2 * mean_words)
+    # Log-normal com cauda longa, parecida com a do IMDB
+    sigma = 0.7
+    mu = np.log(mean_words) - sigma ** 2 / 2
+    return max(1, int(rng.lognormvariate(mu, sigma)))
+
+
+def generate_reviews(n, mean_words=150, distribution='lognormal', positive_ratio=0.5,
+                     seed=42):
+    """
+    Gera n reviews sintéticos (texto, rótulo) com tamanho configurável
+    """
+    if distribution not in LENGTH_DISTRIBUTIONS:
+        raise ValueError(f"Distribuição inválida: {distribution}")
+
+    rng = random.Random(seed)
+    reviews = []
+    for _ in range(n):
+        label = 1 if rng.random() < positive_ratio else 0
+        polar, opposite = (POSITIVE_WORDS, NEGATIVE_WORDS) if label else (NEGATIVE_WORDS, POSITIVE_WORDS)
+        words = []
+        for _ in range(sample_length(rng, mean_words, distribution)):
+            draw = rng.random()
+            if draw < 0.12:
+                words.append(rng.choice(polar))
+            elif draw < 0.15:
+                words.append(rng.choice(opposite))
+            elif draw < 0.50:
+                words.append(rng.choice(NEUTRAL_WORDS))
+            elif draw < 0.97:
+                words.append(rng.choice(FILLER_WORDS))
+            else:
+                words.append(rng.choice(NOISE))
+        text = ' '.join(words)
+        reviews.append((text[0].upper() + text[1:] + '.', label))
+    return reviews
+
+
+def summarize(latencies, items=None):
+    """
+    Resume latências (em segundos) em percentis em milissegundos; com items,
+    calcula também a vazão em itens por segundo
+    """
+    latencies = np.asarray(latencies, dtype=np.float64)
+    if not len(latencies):
+        return {'n': 0}
+
+    total = float(latencies.sum())
+    summary = {
+        'n': int(len(latencies)),
+        'mean_ms': float(latencies.mean() * 1000),
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'max_ms': float(latencies.max() * 1000)
+    }
+    if items is not None and total > 0:
+        summary['throughput_per_s'] = items / total
+    return summary
+
+
+def time_calls(function, arguments, warmup=3):
+    """
+    Mede a latência de function(argumento) para cada argumento
+    """
+    for argument in arguments[:warmup]:
+        function(argument)
+
+    latencies = []
+    for argument in arguments:
+        start = time.perf_counter()
+        function(argument)
+        latencies.append(time.perf_counter() - start)
+    return latencies
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+
+class ResultCache:
+    """
+    Cache LRU em memória, com TTL opcional, para resultados do modelo
+    """
+
+    def __init__(self, maxsize=10000, ttl=None):
+        # maxsize <= 0 desativa o cache; ttl em segundos (None = sem expiração)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(text, model_version, *namespace):
+        """
+        Monta a chave a partir do hash do texto bruto e da versão do modelo
+        """
+        digest = hashlib.sha256(str(text).encode('utf-8')).hexdigest()
+        return (model_version,) + tuple(namespace) + (digest,)
+
+    def get(self, key):
+        """
+        Retorna o valor armazenado ou None em caso de falta
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Armazena um valor, descartando o menos usado se o cache estiver cheio
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Invalida todas as entradas (por exemplo, ao recarregar o modelo)
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        Retorna os contadores do cache
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
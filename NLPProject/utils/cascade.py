@@ -0,0 +1,50 @@
+from utils.metrics import CASCADE_TEXTS
+import numpy as np
+
+
+def escalate(texts, predictions, probabilities, confidences, transformer, threshold):
+    """
+    Reclassifica com o transformer, em um único lote, os textos cuja
+    confiança do Naive Bayes ficou abaixo do limiar. Retorna previsões,
+    probabilidades e confiança combinadas e a máscara dos textos escalados.
+    """
+    escalated = np.asarray(confidences) < threshold
+    predictions = np.array(predictions)
+    probabilities = np.array(probabilities, dtype=np.float64)
+    confidences = np.array(confidences, dtype=np.float64)
+
+    indices = np.flatnonzero(escalated)
+    if len(indices):
+        transformer_predictions, transformer_probabilities, transformer_confidences = \
+            transformer.score([texts[i] for i in indices])
+        predictions[indices] = transformer_predictions
+        probabilities[indices] = transformer_probabilities
+        confidences[indices] = transformer_confidences
+
+    CASCADE_TEXTS.inc('transformer', amount=len(indices))
+    CASCADE_TEXTS.inc('naive_bayes', amount=len(escalated) - len(indices))
+    return predictions, probabilities, confidences, escalated
+
+
+class CascadeScorer:
+    """
+    Classificação em cascata: todo texto passa pelo SentimentClassifier e só
+    os de baixa confiança seguem para o transformer
+    """
+
+    def __init__(self, classifier, transformer, preprocessor, threshold=0.8):
+        self.classifier = classifier
+        self.transformer = transformer
+        self.preprocessor = preprocessor
+        self.threshold = threshold
+
+    def score(self, texts):
+        """
+        Recebe textos originais (o transformer não usa o pré-processamento) e
+        retorna previsões, probabilidades, confiança e a máscara de escalados
+        """
+        texts = list(texts)
+        processed_texts = self.preprocessor.preprocess_many(texts)
+        predictions, probabilities, confidences = self.classifier.score(processed_texts)
+        return escalate(texts, predictions, probabilities, confidences,
+                        self.transformer, self.threshold)
@@ -0,0 +1,165 @@
+from utils.artifacts import ArrayVocabulary, build_model, vectorizer_params
+from utils.training import SentimentClassifier
+import numpy as np
+import pickle
+import time
+import sys
+
+
+def class_log_prob_spread(feature_log_prob):
+    """
+    Maior diferença de log-probabilidade de cada termo entre as classes; com
+    spread próximo de zero o termo não altera a decisão do Naive Bayes
+    """
+    feature_log_prob = np.asarray(feature_log_prob)
+    return feature_log_prob.max(axis=0) - feature_log_prob.min(axis=0)
+
+
+def compact_model(sentiment_classifier, prune_threshold=0.0, dtype=np.float32):
+    """
+    Cria uma cópia compacta do modelo: parâmetros em float32, vocabulário em
+    arrays ordenados (ArrayVocabulary) e sem os termos com spread abaixo de
+    prune_threshold
+    """
+    vectorizer = sentiment_classifier.vectorizer
+    classifier = sentiment_classifier.classifier
+    params = vectorizer_params(vectorizer)
+
+    vocabulary = vectorizer.vocabulary_
+    if not isinstance(vocabulary, ArrayVocabulary):
+        vocabulary = ArrayVocabulary.from_dict(vocabulary)
+
+    # Colunas mantidas e seu novo índice, preservando a ordem original
+    keep = class_log_prob_spread(classifier.feature_log_prob_) >= prune_threshold
+    new_index = np.cumsum(keep) - 1
+    term_indices = np.asarray(vocabulary.indices)
+    kept_terms = keep[term_indices]
+
+    # Os termos continuam ordenados; a largura acompanha o maior termo mantido
+    terms = vocabulary.terms[kept_terms]
+    width = max(int(np.char.str_len(terms).max()) if len(terms) else 1, 1)
+    arrays = {
+        'terms': terms.astype(f'S{width}'),
+        'term_indices': new_index[term_indices[kept_terms]].astype(np.int32),
+        'feature_log_prob': np.ascontiguousarray(
+            np.asarray(classifier.feature_log_prob_)[:, keep], dtype=dtype),
+        'class_log_prior': np.asarray(classifier.class_log_prior_, dtype=dtype)
+    }
+    if vectorizer.use_idf:
+        # Termos removidos deixam de contar na normalização do TF-IDF
+        arrays['idf'] = np.asarray(vectorizer.idf_)[keep].astype(dtype)
+
+    compact = SentimentClassifier()
+    compact.vectorizer, compact.classifier = build_model(
+        params, classifier.classes_.tolist(), arrays)
+    return compact
+
+
+def _deep_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, ArrayVocabulary):
+        return value.terms.nbytes + value.indices.nbytes
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(key) + sys.getsizeof(item)
+                                          for key, item in value.items())
+    if isinstance(value, (set, frozenset, list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def model_footprint(sentiment_classifier):
+    """
+    Memória aproximada (bytes) do vocabulário e dos parâmetros, e tamanho do
+    modelo serializado
+    """
+    vectorizer = sentiment_classifier.vectorizer
+    classifier = sentiment_classifier.classifier
+
+    # Apenas a estrutura consultada na inferência (dict ou ArrayVocabulary).
+    # stop_words_ guarda os termos cortados por max_features/min_df, não é
+    # usado nas consultas e é contado à parte
+    vocabulary = _deep_size(vectorizer.vocabulary_)
+    cut_terms = _deep_size(getattr(vectorizer, 'stop_words_', None))
+    parameters = (np.asarray(classifier.feature_log_prob_).nbytes
+                  + np.asarray(classifier.class_log_prior_).nbytes)
+    if vectorizer.use_idf:
+        parameters += np.asarray(vectorizer.idf_).nbytes
+
+    return {
+        'terms': len(vectorizer.vocabulary_),
+        'vocabulary_bytes': vocabulary,
+        'cut_terms_bytes': cut_terms,
+        'parameter_bytes': parameters,
+        'serialized_bytes': len(pickle.dumps((vectorizer, classifier),
+                                             protocol=pickle.HIGHEST_PROTOCOL))
+    }
+
+
+def scoring_latency(sentiment_classifier, texts, single_texts=200):
+    """
+    Latência de score() em ms por texto: um texto por chamada e o lote inteiro
+    """
+    texts = list(texts)
+    sentiment_classifier.score(texts[:10])
+
+    sample = texts[:single_texts]
+    start = time.perf_counter()
+    for text in sample:
+        sentiment_classifier.score([text])
+    single = (time.perf_counter() - start) / max(len(sample), 1) * 1000
+
+    start = time.perf_counter()
+    sentiment_classifier.score(texts)
+    batch = (time.perf_counter() - start) / max(len(texts), 1) * 1000
+    return {'single_ms': single, 'batch_ms': batch}
+
+
+def compaction_report(original, compact, texts, labels):
+    """
+    Compara memória, latência e qualidade do modelo original e do compacto
+    """
+    labels = np.asarray(labels)
+    original_predictions, original_probabilities, _ = original.score(texts)
+    compact_predictions, compact_probabilities, _ = compact.score(texts)
+
+    return {
+        'original': {**model_footprint(original), **scoring_latency(original, texts)},
+        'compact': {**model_footprint(compact), **scoring_latency(compact, texts)},
+        'original_accuracy': float((original_predictions == labels).mean()),
+        'compact_accuracy': float((compact_predictions == labels).mean()),
+        'agreement': float((original_predictions == compact_predictions).mean()),
+        'max_probability_difference': float(
+            np.abs(original_probabilities - compact_probabilities).max())
+    }
+
+
+def _size_change(before, after):
+    # Nunca reporta economia negativa: sem redução, mostra o aumento
+    if before and after < before:
+        return f"{1 - after / before:.0%} de economia"
+    if before and after > before:
+        return f"sem economia, {after / before - 1:.0%} maior"
+    return "sem economia"
+
+
+def print_compaction_report(report):
+    original = report['original']
+    compact = report['compact']
+    print(f"Termos: {original['terms']} -> {compact['terms']}")
+    for key, label in [('vocabulary_bytes', 'Vocabulário'), ('parameter_bytes', 'Parâmetros'),
+                       ('serialized_bytes', 'Serializado')]:
+        print(f"{label}: {original[key] / 1024:.1f} KB -> {compact[key] / 1024:.1f} KB "
+              f"({_size_change(original[key], compact[key])})")
+    if original['cut_terms_bytes']:
+        print(f"Termos cortados (stop_words_, fora das consultas): "
+              f"{original['cut_terms_bytes'] / 1024:.1f} KB descartados")
+    for key, label in [('single_ms', 'Latência (1 texto)'), ('batch_ms', 'Latência (lote)')]:
+        print(f"{label}: {original[key]:.3f} -> {compact[key]:.3f} ms/texto "
+              f"({compact[key] / original[key]:.2f}x)")
+    print(f"Acurácia: {report['original_accuracy']:.4f} -> {report['compact_accuracy']:.4f} "
+          f"({report['compact_accuracy'] - report['original_accuracy']:+.4f})")
+    print(f"Concordância das previsões: {report['agreement']:.2%} "
+          f"(diferença máxima de probabilidade {report['max_probability_difference']:.2e})")
@@ -0,0 +1,240 @@
+from itertools import islice
+import pandas as pd
+import numpy as np
+import hashlib
+import shutil
+import gzip
+import json
+import os
+
+
+# Pastas de rótulos no layout do IMDB e o valor de sentimento de cada uma
+IMDB_LABELS = {'pos': 1, 'neg': 0}
+IMDB_SPLITS = ('train', 'test')
+
+
+def _imdb_label_dirs(root):
+    # Aceita root/{pos,neg} ou root/{train,test}/{pos,neg}
+    roots = [os.path.join(root, split) for split in IMDB_SPLITS
+             if os.path.isdir(os.path.join(root, split))] or [root]
+    for base in roots:
+        for folder, label in IMDB_LABELS.items():
+            path = os.path.join(base, folder)
+            if os.path.isdir(path):
+                yield path, label
+
+
+def _imdb_files(root):
+    for path, label in _imdb_label_dirs(root):
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.txt'):
+                yield os.path.join(path, name), label
+
+
+def load_imdb_directory(root):
+    """
+    Carrega um dataset no layout do IMDB (pastas pos/neg com arquivos .txt)
+    """
+    texts = []
+    labels = []
+    for path, label in _imdb_files(root):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            texts.append(f.read())
+        labels.append(label)
+    return pd.DataFrame({'text': texts, 'sentiment': labels})
+
+
+def load_csv_dataset(path, text_column='text', label_column='sentiment'):
+    """
+    Carrega um CSV com colunas de texto e rótulo
+    """
+    data = pd.read_csv(path, usecols=[text_column, label_column]).dropna()
+    return pd.DataFrame({'text': data[text_column].astype(str),
+                         'sentiment': data[label_column]}).reset_index(drop=True)
+
+
+def load_dataset(path, text_column='text', label_column='sentiment'):
+    """
+    Carrega um diretório no layout do IMDB ou um arquivo CSV
+    """
+    if os.path.isdir(path):
+        return load_imdb_directory(path)
+    return load_csv_dataset(path, text_column, label_column)
+
+
+def load_unlabeled_texts(path, text_column='text'):
+    """
+    Carrega textos sem rótulo: arquivos .txt de um diretório (recursivo, ex.:
+    train/unsup do IMDB), um JSONL ou a coluna de texto de um CSV
+    """
+    if os.path.isdir(path):
+        texts = []
+        for folder, _, names in sorted(os.walk(path)):
+            for name in sorted(names):
+                if name.endswith('.txt'):
+                    with open(os.path.join(folder, name), encoding='utf-8', errors='replace') as f:
+                        texts.append(f.read())
+        return texts
+    if path.endswith(('.jsonl', '.ndjson')):
+        data = pd.read_json(path, lines=True)
+    else:
+        data = pd.read_csv(path, usecols=[text_column])
+    return data[text_column].dropna().astype(str).tolist()
+
+
+def has_dataset(path):
+    """
+    Indica se o caminho contém dados (CSV ou arquivos no layout do IMDB)
+    """
+    if os.path.isdir(path):
+        return next(_imdb_files(path), None) is not None
+    return os.path.isfile(path)
+
+
+def dataset_fingerprint(path, text_column='text', label_column='sentiment'):
+    """
+    Identifica o conteúdo do dataset pelo caminho, tamanho e data dos arquivos
+    """
+    digest = hashlib.sha256(f'{text_column}|{label_column}'.encode('utf-8'))
+    files = [file_path for file_path, _ in _imdb_files(path)] if os.path.isdir(path) else [path]
+    for file_path in files:
+        stat = os.stat(file_path)
+        relative = os.path.relpath(file_path, path) if os.path.isdir(path) else os.path.abspath(path)
+        digest.update(f'{relative}|{stat.st_size}|{stat.st_mtime_ns}\n'.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+class ProcessedShardCache:
+    """
+    Textos já pré-processados gravados em shards JSONL comprimidos (gzip),
+    identificados pelo dataset e pela versão do preprocessador
+    """
+
+    def __init__(self, cache_dir='data/cache', shard_size=10000):
+        self.cache_dir = cache_dir
+        self.shard_size = shard_size
+
+    def path_for(self, dataset_key, preprocessor_key):
+        return os.path.join(self.cache_dir, f'{dataset_key}-{preprocessor_key}')
+
+    def is_complete(self, path):
+        # O manifesto só é gravado quando todos os shards estão prontos
+        return os.path.exists(os.path.join(path, 'manifest.json'))
+
+    def iter_shards(self, path):
+        """
+        Lê os shards um a um, retornando (textos pré-processados, rótulos)
+        """
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+
+        for name in manifest['shards']:
+            texts = []
+            labels = []
+            with gzip.open(os.path.join(path, name), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    texts.append(record['processed_text'])
+                    labels.append(record['sentiment'])
+            yield texts, labels
+
+    def load(self, path):
+        """
+        Lê os shards de um diretório completo (None se não existir)
+        """
+        if not self.is_complete(path):
+            return None
+
+        texts = []
+        labels = []
+        for shard_texts, shard_labels in self.iter_shards(path):
+            texts.extend(shard_texts)
+            labels.extend(shard_labels)
+        return pd.DataFrame({'processed_text': texts, 'sentiment': labels})
+
+    def _write_shard(self, directory, index, records):
+        name = f'shard-{index:05d}.jsonl.gz'
+        with gzip.open(os.path.join(directory, name), 'wt', encoding='utf-8') as f:
+            for processed_text, label in records:
+                f.write(json.dumps({'processed_text': processed_text,
+                                    'sentiment': label}) + '\n')
+        return name
+
+    def _finish(self, tmp_path, path, shards, rows, metadata):
+        # O manifesto marca o cache como completo
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+            json.dump({'shards': shards, 'rows': rows, **(metadata or {})}, f, indent=2)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    def _start(self, path):
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        return tmp_path
+
+    def save_stream(self, path, chunks, metadata=None):
+        """
+        Grava cada bloco (textos pré-processados, rótulos) como um shard à
+        medida que é consumido, repassando-o adiante; o cache só fica
+        completo quando o iterador chega ao fim
+        """
+        tmp_path = self._start(path)
+        shards = []
+        rows = 0
+        for texts, labels in chunks:
+            texts = list(texts)
+            labels = np.asarray(labels).tolist()
+            shards.append(self._write_shard(tmp_path, len(shards), zip(texts, labels)))
+            rows += len(texts)
+            yield texts, labels
+        self._finish(tmp_path, path, shards, rows, metadata)
+
+    def save(self, path, data, metadata=None):
+        """
+        Grava os shards em um diretório temporário e o renomeia ao final, para
+        que execuções interrompidas não deixem um cache incompleto
+        """
+        tmp_path = self._start(path)
+        records = zip(data['processed_text'], data['sentiment'].tolist())
+        shards = []
+        while True:
+            batch = list(islice(records, self.shard_size))
+            if not batch:
+                break
+            shards.append(self._write_shard(tmp_path, len(shards), batch))
+        self._finish(tmp_path, path, shards, len(data), metadata)
+
+
+def load_processed_dataset(path, preprocessor, cache_dir='data/cache', n_jobs=None,
+                           text_column='text', label_column='sentiment', use_cache=True):
+    """
+    Retorna o dataset com a coluna processed_text, reaproveitando os shards
+    em cache quando o dataset e o preprocessador não mudaram
+    """
+    cache = ProcessedShardCache(cache_dir)
+    dataset_key = dataset_fingerprint(path, text_column, label_column)
+    preprocessor_key = preprocessor.fingerprint()
+    cache_path = cache.path_for(dataset_key, preprocessor_key)
+
+    if use_cache:
+        data = cache.load(cache_path)
+        if data is not None:
+            print(f"Usando textos pré-processados em cache ({cache_path})")
+            return data
+
+    data = load_dataset(path, text_column, label_column)
+    print(f"Pré-processando {len(data)} textos...")
+    data['processed_text'] = preprocessor.preprocess_parallel(data['text'], n_jobs=n_jobs)
+
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache.save(cache_path, data, {
+            'source': os.path.abspath(path),
+            'dataset': dataset_key,
+            'preprocessor': preprocessor_key,
+            'preprocessor_version': preprocessor.VERSION
+        })
+        print(f"Textos pré-processados salvos em {cache_path}")
+    return data
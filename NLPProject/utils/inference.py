@@ -0,0 +1,167 @@
+from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy.special import logsumexp
+from utils.metrics import STAGE_LATENCY
+import numpy as np
+import re
+
+
+class FastSentimentEngine:
+    """
+    Motor de inferência em NumPy para TF-IDF + MultinomialNB, sem a validação
+    de entrada e a construção de matrizes esparsas do scikit-learn
+    """
+
+    def __init__(self, vocabulary, feature_log_prob, class_log_prior, classes,
+                 idf=None, token_pattern=r'(?u)\b\w\w+\b', lowercase=True,
+                 stop_words=None, binary=False, sublinear_tf=False, norm='l2'):
+        self.vocabulary = vocabulary
+        self.feature_log_prob = feature_log_prob
+        self.class_log_prior = class_log_prior
+        self.classes = classes
+        self.idf = idf
+        self.lowercase = lowercase
+        self.stop_words = stop_words
+        self.binary = binary
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self._find_tokens = re.compile(token_pattern).findall
+
+    @classmethod
+    def from_classifier(cls, sentiment_classifier):
+        """
+        Constrói o motor a partir de um SentimentClassifier treinado
+        """
+        vectorizer = sentiment_classifier.vectorizer
+        classifier = sentiment_classifier.classifier
+
+        # Apenas a configuração padrão de análise por palavras é suportada
+        if not isinstance(vectorizer, TfidfVectorizer):
+            raise ValueError("O motor rápido exige um TfidfVectorizer")
+        if (vectorizer.analyzer != 'word' or tuple(vectorizer.ngram_range) != (1, 1)
+                or vectorizer.preprocessor is not None or vectorizer.tokenizer is not None
+                or vectorizer.strip_accents is not None):
+            raise ValueError("Configuração do vetorizador não suportada pelo motor rápido")
+        if vectorizer.norm not in ('l1', 'l2', None):
+            raise ValueError(f"Normalização não suportada: {vectorizer.norm}")
+
+        return cls(
+            vocabulary=vectorizer.vocabulary_,
+            feature_log_prob=classifier.feature_log_prob_,
+            class_log_prior=classifier.class_log_prior_,
+            classes=classifier.classes_,
+            idf=vectorizer.idf_ if vectorizer.use_idf else None,
+            token_pattern=vectorizer.token_pattern,
+            lowercase=vectorizer.lowercase,
+            stop_words=vectorizer.get_stop_words(),
+            binary=vectorizer.binary,
+            sublinear_tf=vectorizer.sublinear_tf,
+            norm=vectorizer.norm
+        )
+
+    def vectorize(self, text):
+        """
+        Retorna os índices (ordenados) e pesos TF-IDF dos termos do texto
+        """
+        if self.lowercase:
+            text = text.lower()
+
+        # ArrayVocabulary: todos os tokens do texto em uma única busca
+        lookup_many = getattr(self.vocabulary, 'lookup_many', None)
+        if lookup_many is not None:
+            stop_words = self.stop_words
+            tokens = self._find_tokens(text)
+            if stop_words is not None:
+                tokens = [token for token in tokens if token not in stop_words]
+            columns = lookup_many(tokens)
+            indices, counts = np.unique(columns[columns >= 0], return_counts=True)
+            return indices, self.weight(indices, counts)
+
+        # Contagem dos termos presentes no vocabulário
+        counts = {}
+        lookup = self.vocabulary.get
+        stop_words = self.stop_words
+        for token in self._find_tokens(text):
+            if stop_words is not None and token in stop_words:
+                continue
+            index = lookup(token)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+
+        indices = np.array(sorted(counts), dtype=np.intp)
+        return indices, self.weight(indices, [counts[index] for index in indices.tolist()])
+
+    def weight(self, indices, counts):
+        """
+        Aplica tf (binário/sublinear), idf e normalização às contagens
+        """
+        values = np.array(counts, dtype=np.float64)
+        if self.binary:
+            values[:] = 1.0
+        if self.sublinear_tf:
+            values = np.log(values) + 1.0
+        if self.idf is not None:
+            values *= self.idf[indices]
+
+        if self.norm == 'l2':
+            norm = np.sqrt(np.dot(values, values))
+        elif self.norm == 'l1':
+            norm = np.abs(values).sum()
+        else:
+            norm = 0.0
+        if norm > 0:
+            values /= norm
+        return values
+
+    def joint_log_likelihood(self, indices, values):
+        """
+        Log-verossimilhança conjunta do Naive Bayes sobre os termos não nulos
+        """
+        return self.class_log_prior + self.feature_log_prob[:, indices] @ values
+
+    def predict_proba(self, texts):
+        """
+        Retorna as probabilidades das previsões (mesmo resultado do scikit-learn)
+        """
+        return self._classify([self.vectorize(text) for text in texts])
+
+    def _classify(self, vectors):
+        jll = np.array([self.joint_log_likelihood(indices, values)
+                        for indices, values in vectors])
+        return np.exp(jll - logsumexp(jll, axis=1, keepdims=True))
+
+    def predict(self, texts):
+        """
+        Realiza previsões para novos textos
+        """
+        return self.score(texts)[0]
+
+    def score(self, texts):
+        """
+        Retorna previsões, probabilidades e confiança, como SentimentClassifier.score
+        """
+        with STAGE_LATENCY.time('vectorize'):
+            vectors = [self.vectorize(text) for text in texts]
+        return self.score_vectors(vectors)
+
+    def score_vectors(self, vectors):
+        """
+        Como score, mas a partir de vetores (índices, pesos) já calculados
+        """
+        with STAGE_LATENCY.time('classify'):
+            probabilities = self._classify(vectors)
+        predictions = self.classes[probabilities.argmax(axis=1)]
+        confidences = probabilities.max(axis=1)
+        return predictions, probabilities, confidences
+
+
+def check_equivalence(sentiment_classifier, engine, texts, atol=1e-12):
+    """
+    Compara as probabilidades do motor com as do classificador original e
+    retorna a maior diferença absoluta encontrada
+    """
+    expected = sentiment_classifier.predict_proba(texts)
+    actual = engine.predict_proba(texts)
+    difference = float(np.abs(expected - actual).max()) if len(texts) else 0.0
+    if difference > atol:
+        raise AssertionError(f"Probabilidades divergentes (diferença máxima {difference:.3g})")
+    return difference
@@ -0,0 +1,230 @@
+from bisect import bisect_left
+import threading
+import time
+
+
+# Limites padrão (em segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    """
+    Mede o tempo de um bloco e registra no histograma ao sair
+    """
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Counter:
+    """
+    Contador monotônico, opcionalmente com rótulos
+    """
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} '
+                         f'{_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """
+    Histograma com limites fixos, opcionalmente com rótulos
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS,
+                 registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def observe(self, value, *labels):
+        # Contagens por faixa (não cumulativas) + soma e total; acumuladas ao exportar
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels):
+        """
+        Context manager que registra a duração do bloco
+        """
+        return _Timer(self, labels)
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((labels, ([*series[0]], series[1], series[2]))
+                           for labels, series in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                label_text = _format_labels(self.labelnames, labels,
+                                            [('le', _format_value(float(bound)))])
+                lines.append(f'{self.name}_bucket{label_text} {cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+class CallbackGauge:
+    """
+    Medidor cujos valores são lidos de uma função no momento da exportação
+    """
+
+    def __init__(self, name, documentation, callback, registry=None):
+        # callback retorna um número ou um dict {rótulo: valor} (rótulo 'key')
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} gauge']
+        value = self.callback()
+        if isinstance(value, dict):
+            for key, item in sorted(value.items()):
+                lines.append(f'{self.name}{_format_labels(("key",), (key,))} '
+                             f'{_format_value(item)}')
+        elif value is not None:
+            lines.append(f'{self.name} {_format_value(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas exportadas no formato de texto do Prometheus
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica já registrada: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def unregister(self, name):
+        self._metrics.pop(name, None)
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Tipo de conteúdo do formato de exposição do Prometheus
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Métricas do caminho de inferência
+STAGE_LATENCY = Histogram(
+    'sentiment_stage_latency_seconds',
+    'Latência de cada estágio da inferência (preprocess, vectorize, classify)',
+    labelnames=('stage',)
+)
+REQUEST_LATENCY = Histogram(
+    'sentiment_request_latency_seconds',
+    'Latência total das requisições por endpoint',
+    labelnames=('endpoint',)
+)
+REQUESTS = Counter(
+    'sentiment_requests_total',
+    'Requisições recebidas por endpoint e status HTTP',
+    labelnames=('endpoint', 'status')
+)
+ERRORS = Counter(
+    'sentiment_errors_total',
+    'Requisições com erro (status >= 400) por endpoint',
+    labelnames=('endpoint',)
+)
+BATCH_SIZE = Histogram(
+    'sentiment_batch_size',
+    'Quantidade de textos por chamada ao modelo',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+)
+TEXT_LENGTH = Histogram(
+    'sentiment_text_length_chars',
+    'Tamanho dos textos de entrada em caracteres',
+    buckets=(16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+)
+CASCADE_TEXTS = Counter(
+    'sentiment_cascade_texts_total',
+    'Textos classificados no modo cascata, por modelo que decidiu',
+    labelnames=('model',)
+)
+
+
+def observe_request(endpoint, status, duration):
+    """
+    Registra contagem, erros e latência de uma requisição
+    """
+    REQUESTS.inc(endpoint, status)
+    REQUEST_LATENCY.observe(duration, endpoint)
+    if status >= 400:
+        ERRORS.inc(endpoint)
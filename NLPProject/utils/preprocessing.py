@@ -2,59 +2,265 @@ import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+import pandas as pd
+import threading
+import hashlib
+import time
+import os
 import re
 
 
-# Download todos os recursos necessários
-def download_nltk_resources():
-    resources = [
-        'punkt',
-        'stopwords',
-        'wordnet',
-        'omw-1.4',
-        'averaged_perceptron_tagger',
-        'punkt_tab',
-        'punkt_tabs'
-    ]
-    for resource in resources:
+# Recursos do NLTK usados pelo TextPreprocessor: (pacote, caminho local)
+NLTK_RESOURCES = [
+    ('stopwords', 'corpora/stopwords'),
+    ('wordnet', 'corpora/wordnet')
+]
+
+_resources_lock = threading.Lock()
+_resources_checked = False
+
+
+def is_offline_mode():
+    """
+    Modo offline ativado pela variável de ambiente NLTK_OFFLINE
+    """
+    return os.environ.get('NLTK_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+
+def missing_nltk_resources():
+    """
+    Lista os recursos que não estão disponíveis localmente
+    """
+    missing = []
+    for resource, path in NLTK_RESOURCES:
         try:
-            nltk.download(resource, quiet=True)
-        except:
-            print(f"Não foi possível baixar {resource}, mas continuando...")
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(resource)
+    return missing
+
+
+def ensure_nltk_resources(offline=None):
+    """
+    Verifica os recursos locais e baixa apenas os ausentes, uma única vez por
+    processo. Em modo offline, falha imediatamente se algum recurso estiver
+    faltando.
+    """
+    global _resources_checked
+
+    if offline is None:
+        offline = is_offline_mode()
+
+    with _resources_lock:
+        if _resources_checked:
+            return
+
+        start = time.perf_counter()
+        missing = missing_nltk_resources()
+
+        if missing and offline:
+            raise LookupError(
+                f"Recursos do NLTK ausentes em modo offline: {', '.join(missing)}"
+            )
+
+        for resource in missing:
+            try:
+                nltk.download(resource, quiet=True)
+            except Exception:
+                print(f"Não foi possível baixar {resource}, mas continuando...")
+
+        # Marcar como verificado mesmo com falhas: uma nova tentativa só
+        # repetiria o timeout do download a cada carga (e em cada processo)
+        _resources_checked = True
+        still_missing = missing_nltk_resources() if missing else []
+        if still_missing:
+            print(f"Aviso: recursos do NLTK indisponíveis ({', '.join(still_missing)}); "
+                  f"defina NLTK_OFFLINE=1 para falhar em vez de continuar")
+        print(f"Recursos do NLTK verificados em {time.perf_counter() - start:.2f}s")
+
+
+def mark_nltk_resources_checked():
+    """
+    Dispensa a verificação neste processo (ex.: processos de um pool cujo
+    processo principal já verificou os recursos)
+    """
+    global _resources_checked
+    _resources_checked = True
 
 
-# Baixar recursos
-download_nltk_resources()
+# Padrões de normalização compilados uma única vez
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z\s]')
+
+# Tabela equivalente a NON_ALPHA_PATTERN para textos ASCII (via str.translate)
+ASCII_DELETE_TABLE = str.maketrans('', '', ''.join(
+    chr(code) for code in range(128) if NON_ALPHA_PATTERN.match(chr(code))
+))
 
 
 class TextPreprocessor:
-    def __init__(self):
+    # Incrementar sempre que a saída de preprocess mudar (invalida caches em disco)
+    VERSION = 1
+
+    def __init__(self, lemma_cache_size=50000, offline=None):
+        # Recursos do NLTK são carregados no primeiro uso (ver load)
+        self.offline = offline
+        self.lemmatizer = None
+        self.stop_words = None
+
+        # Cache limitado token -> lema (None para tokens descartados)
+        self.lemma_cache_size = lemma_cache_size
+        self._build_token_cache()
+
+    def load(self):
+        """
+        Carrega lematizador e stopwords; chamado automaticamente no primeiro uso
+        """
+        if self.stop_words is not None:
+            return self
+
+        ensure_nltk_resources(self.offline)
         self.lemmatizer = WordNetLemmatizer()
         try:
             self.stop_words = set(stopwords.words('english'))
-        except:
+        except LookupError:
             print("Aviso: usando conjunto vazio de stopwords")
             self.stop_words = set()
+        return self
 
-    def preprocess(self, text):
+    def fingerprint(self):
         """
-        Realiza o pré-processamento completo do texto
+        Identifica a saída do preprocessador (versão do código e stopwords)
+        """
+        self.load()
+        digest = hashlib.sha256(f'v{self.VERSION}'.encode('utf-8'))
+        digest.update('\n'.join(sorted(self.stop_words)).encode('utf-8'))
+        return digest.hexdigest()[:12]
+
+    def _build_token_cache(self):
+        self._normalize_token = lru_cache(maxsize=self.lemma_cache_size)(self._lemmatize_token)
+
+    def __getstate__(self):
+        # O cache não é serializável; cada cópia monta o seu
+        state = self.__dict__.copy()
+        del state['_normalize_token']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_token_cache()
+
+    def _lemmatize_token(self, token):
+        """
+        Remove stopwords e tokens curtos; lematiza os demais
+        """
+        if self.stop_words is None:
+            self.load()
+        if token in self.stop_words or len(token) <= 2:
+            return None
+        return self.lemmatizer.lemmatize(token)
+
+    def lemma_cache_info(self):
+        """
+        Estatísticas do cache de lemas
+        """
+        return self._normalize_token.cache_info()
+
+    def clean(self, text):
+        """
+        Converte para minúsculas e remove HTML, números e caracteres especiais
         """
         # Converter para minúsculas
         text = str(text).lower()
 
         # Remover HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
+        if '<' in text:
+            text = HTML_TAG_PATTERN.sub('', text)
 
         # Remover caracteres especiais e números
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
+        if text.isascii():
+            text = text.translate(ASCII_DELETE_TABLE)
+        else:
+            text = NON_ALPHA_PATTERN.sub('', text)
 
+        return text
+
+    def preprocess(self, text):
+        """
+        Realiza o pré-processamento completo do texto
+        """
         # Tokenização simples (split por espaços)
-        tokens = text.split()
+        tokens = self.clean(text).split()
 
-        # Remover stopwords e lematização
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens
-                  if token not in self.stop_words and len(token) > 2]
+        # Remover stopwords e lematização (com cache por token)
+        lemmas = map(self._normalize_token, tokens)
 
         # Juntar tokens de volta em uma string
-        return ' '.join(tokens)
\ No newline at end of file
+        return ' '.join([lemma for lemma in lemmas if lemma is not None])
+
+    def preprocess_many(self, texts):
+        """
+        Pré-processa uma sequência de textos reaproveitando o mesmo cache
+        """
+        preprocess = self.preprocess
+        return [preprocess(text) for text in texts]
+
+    def create_pool(self, n_jobs=None):
+        """
+        Cria um pool de processos reutilizável por várias chamadas a
+        preprocess_parallel (cada processo tem seu próprio preprocessador)
+        """
+        # Verificar (e baixar) os recursos uma vez aqui, e não em cada processo
+        ensure_nltk_resources(self.offline)
+        return ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1,
+                                   initializer=_init_worker,
+                                   initargs=(self.lemma_cache_size, self.offline))
+
+    def preprocess_parallel(self, texts, n_jobs=None, chunksize=1000, executor=None):
+        """
+        Pré-processa textos em paralelo com um pool de processos,
+        mantendo a ordem original (Series de entrada gera Series de saída)
+        """
+        n_jobs = n_jobs or os.cpu_count() or 1
+        series = texts if isinstance(texts, pd.Series) else None
+        texts = list(texts)
+
+        # Para poucos textos o custo de criar o pool não compensa
+        if (executor is None and n_jobs == 1) or len(texts) <= chunksize:
+            processed = self.preprocess_many(texts)
+        else:
+            iterator = iter(texts)
+            chunks = iter(lambda: list(islice(iterator, chunksize)), [])
+
+            # Cada processo cria seu próprio lematizador e conjunto de stopwords
+            pool = executor or self.create_pool(n_jobs)
+            try:
+                processed = [
+                    text
+                    for chunk in pool.map(_preprocess_chunk, chunks)
+                    for text in chunk
+                ]
+            finally:
+                if executor is None:
+                    pool.shutdown()
+
+        if series is not None:
+            return pd.Series(processed, index=series.index, name=series.name)
+        return processed
+
+
+# Preprocessador de cada processo do pool
+_worker_preprocessor = None
+
+
+def _init_worker(lemma_cache_size, offline):
+    global _worker_preprocessor
+    mark_nltk_resources_checked()
+    _worker_preprocessor = TextPreprocessor(lemma_cache_size, offline)
+
+
+def _preprocess_chunk(texts):
+    return _worker_preprocessor.preprocess_many(texts)
\ No newline at end of file
@@ -0,0 +1,291 @@
+from utils.training import SentimentClassifier
+from utils.inference import FastSentimentEngine, check_equivalence
+from utils.shortcut import VocabularyShortcut, check_shortcut
+from datetime import datetime
+import threading
+import time
+import os
+
+
+# Nomes dos artefatos dentro de cada diretório de versão
+ARTIFACT_NAME = 'model.mmap'
+VECTORIZER_NAME = 'vectorizer.pkl'
+CLASSIFIER_NAME = 'classifier.pkl'
+CURRENT_FILE = 'CURRENT'
+
+
+def load_classifier_from_dir(path):
+    """
+    Carrega o modelo de um diretório, preferindo o formato mapeável
+    """
+    artifact_path = os.path.join(path, ARTIFACT_NAME)
+    vectorizer_path = os.path.join(path, VECTORIZER_NAME)
+    classifier_path = os.path.join(path, CLASSIFIER_NAME)
+
+    if os.path.exists(artifact_path):
+        return SentimentClassifier.load_artifact(artifact_path)
+    if os.path.exists(vectorizer_path) and os.path.exists(classifier_path):
+        return SentimentClassifier.load_model(vectorizer_path, classifier_path)
+    raise FileNotFoundError(f"Nenhum modelo encontrado em {path}")
+
+
+def has_model_artifacts(path):
+    """
+    Indica se o diretório contém um modelo (mapeável ou em pickle)
+    """
+    return os.path.exists(os.path.join(path, ARTIFACT_NAME)) or (
+        os.path.exists(os.path.join(path, VECTORIZER_NAME))
+        and os.path.exists(os.path.join(path, CLASSIFIER_NAME))
+    )
+
+
+def is_version_name(version):
+    """
+    Aceita apenas nomes simples de diretório (sem separadores, '..' ou
+    caminhos absolutos), para que uma versão nunca aponte para fora de models/
+    """
+    separators = [sep for sep in (os.sep, os.altsep) if sep]
+    return (
+        isinstance(version, str) and version not in ('', '.', '..')
+        and not any(sep in version for sep in separators)
+        and not os.path.isabs(version)
+    )
+
+
+def save_versioned(classifier, models_dir='models', version=None, make_current=True):
+    """
+    Salva o modelo em models/<versão>/ e, opcionalmente, o marca como atual
+    """
+    # Microssegundos evitam que dois salvamentos no mesmo segundo colidam; a
+    # ordem lexicográfica continua sendo a cronológica
+    version = version or datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    if not is_version_name(version):
+        raise ValueError(f"Nome de versão inválido: {version!r}")
+    path = os.path.join(models_dir, version)
+    # Nunca sobrescrever uma versão existente (pode estar em uso)
+    os.makedirs(path, exist_ok=False)
+
+    classifier.save_model(os.path.join(path, VECTORIZER_NAME),
+                          os.path.join(path, CLASSIFIER_NAME))
+    try:
+        classifier.save_artifact(os.path.join(path, ARTIFACT_NAME))
+    except ValueError:
+        # Vetorizadores sem vocabulário (ex.: hashing) ficam só em pickle
+        pass
+
+    if make_current:
+        set_current_version(models_dir, version)
+    return version
+
+
+def set_current_version(models_dir, version):
+    """
+    Atualiza o ponteiro CURRENT de forma atômica
+    """
+    current_path = os.path.join(models_dir, CURRENT_FILE)
+    tmp_path = f'{current_path}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(version + '\n')
+    os.replace(tmp_path, current_path)
+
+
+class ModelBundle:
+    """
+    Modelo carregado e tudo que depende dele; nunca é alterado após criado
+    """
+
+    def __init__(self, classifier, version, path, engine=None, fingerprint=(), shortcut=None):
+        self.classifier = classifier
+        self.version = version
+        self.path = path
+        self.engine = engine
+        self.shortcut = shortcut
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'path': self.path,
+            'fast_inference': self.engine is not None,
+            'vocabulary_shortcut': self.shortcut is not None,
+            'loaded_at': datetime.fromtimestamp(self.loaded_at).isoformat()
+        }
+
+
+class ModelRegistry:
+    """
+    Mantém o modelo em uso e troca por uma nova versão sem interromper as
+    requisições: a carga acontece em segundo plano e a troca é atômica
+    """
+
+    def __init__(self, models_dir='models', fast_inference=True, on_swap=(), shortcut_preprocessor=None):
+        self.models_dir = models_dir
+        self.fast_inference = fast_inference
+        # Com um preprocessador, cada versão ganha o atalho de vocabulário
+        self.shortcut_preprocessor = shortcut_preprocessor
+        self.on_swap = list(on_swap)
+        self.current = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self.last_error = None
+
+    def resolve(self, version=None):
+        """
+        Decide qual versão carregar: a pedida, a indicada em CURRENT, a mais
+        recente em models/<versão>/ ou, por fim, os artefatos na raiz
+        """
+        if version is None:
+            current_path = os.path.join(self.models_dir, CURRENT_FILE)
+            if os.path.exists(current_path):
+                with open(current_path) as f:
+                    version = f.read().strip() or None
+
+        if version is None and os.path.isdir(self.models_dir):
+            # Só diretórios com artefatos contam (ignora backup/, __pycache__/...)
+            versions = sorted(
+                name for name in os.listdir(self.models_dir)
+                if self._is_version_dir(name)
+                and has_model_artifacts(os.path.join(self.models_dir, name))
+            )
+            if versions:
+                version = versions[-1]
+
+        if version is None:
+            return None, self.models_dir
+
+        if not is_version_name(version):
+            raise ValueError(f"Nome de versão inválido: {version!r}")
+        if not self._is_version_dir(version):
+            raise FileNotFoundError(f"Versão de modelo não encontrada: {version}")
+        return version, os.path.join(self.models_dir, version)
+
+    def _is_version_dir(self, version):
+        # Diretório filho direto de models/ (links simbólicos não saem dele)
+        path = os.path.join(self.models_dir, version)
+        real_parent = os.path.dirname(os.path.realpath(path))
+        return (is_version_name(version) and os.path.isdir(path)
+                and real_parent == os.path.realpath(self.models_dir))
+
+    def _fingerprint(self, path):
+        # Muda quando os artefatos do diretório são regravados
+        names = (ARTIFACT_NAME, VECTORIZER_NAME, CLASSIFIER_NAME)
+        return tuple(
+            os.stat(os.path.join(path, name)).st_mtime_ns
+            for name in names if os.path.exists(os.path.join(path, name))
+        )
+
+    def _build_engine(self, classifier):
+        if not self.fast_inference:
+            return None
+        try:
+            engine = FastSentimentEngine.from_classifier(classifier)
+            terms = list(classifier.feature_names[:200])
+            check_equivalence(classifier, engine, ['', ' '.join(terms)] + terms[:20])
+            return engine
+        except (ValueError, AssertionError) as e:
+            print(f"Motor rápido desativado: {e}")
+            return None
+
+    def _build_shortcut(self, classifier, engine):
+        if self.shortcut_preprocessor is None or engine is None:
+            return None
+        try:
+            shortcut = VocabularyShortcut.from_model(self.shortcut_preprocessor, classifier, engine)
+            forms = sorted(shortcut.surface_index)[:200]
+            check_shortcut(shortcut, ['', ' '.join(forms), 'The <b>unknown</b> words, 42!'] + forms[:20])
+            return shortcut
+        except AssertionError as e:
+            print(f"Atalho de vocabulário desativado: {e}")
+            return None
+
+    def load(self, version=None):
+        """
+        Carrega uma versão sem colocá-la em uso
+        """
+        version, path = self.resolve(version)
+        classifier = load_classifier_from_dir(path)
+        engine = self._build_engine(classifier)
+        bundle = ModelBundle(classifier, version or classifier.version, path, engine,
+                             self._fingerprint(path), self._build_shortcut(classifier, engine))
+
+        # Aquecer o modelo antes da troca (páginas do arquivo, caches do NumPy);
+        # predict_proba não registra as métricas de latência por etapa
+        classifier.predict_proba([''])
+        return bundle
+
+    def swap(self, bundle):
+        """
+        Coloca o modelo em uso; requisições em andamento mantêm o anterior
+        """
+        previous = self.current
+        self.current = bundle
+        for callback in self.on_swap:
+            callback(bundle, previous)
+        return previous
+
+    def reload(self, version=None, make_current=False):
+        """
+        Carrega e troca o modelo; apenas uma recarga acontece por vez. Com
+        make_current, a versão também é gravada em CURRENT, para que o
+        watcher não volte para a anterior
+        """
+        with self._reload_lock:
+            try:
+                bundle = self.load(version)
+                if make_current and version is not None:
+                    set_current_version(self.models_dir, version)
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+            self.last_error = None
+            self.swap(bundle)
+            print(f"Modelo {bundle.version} em uso")
+            return bundle
+
+    def reload_in_background(self, version=None, make_current=False):
+        """
+        Dispara a recarga em uma thread separada
+        """
+        def run():
+            try:
+                self.reload(version, make_current)
+            except Exception as e:
+                print(f"Falha ao recarregar o modelo: {e}")
+
+        thread = threading.Thread(target=run, name='model-reload', daemon=True)
+        thread.start()
+        return thread
+
+    def needs_reload(self):
+        """
+        Indica se a versão resolvida ou seus arquivos mudaram
+        """
+        try:
+            version, path = self.resolve()
+        except (FileNotFoundError, ValueError):
+            return False
+        current = self.current
+        if current is None:
+            return True
+        return path != current.path or self._fingerprint(path) != current.fingerprint
+
+    def start_watcher(self, interval=5.0):
+        """
+        Verifica periodicamente o diretório de modelos e recarrega ao mudar
+        """
+        if self._watcher is not None:
+            return self._watcher
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    if self.needs_reload():
+                        self.reload()
+                except Exception as e:
+                    print(f"Falha ao recarregar o modelo: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+        return self._watcher
@@ -0,0 +1,108 @@
+from nltk.corpus import wordnet
+import numpy as np
+
+
+def noun_morphology():
+    """
+    Regras de sufixo (flexão -> base) e exceções do morphy do WordNet para
+    substantivos, a classe usada pelo WordNetLemmatizer por padrão
+    """
+    substitutions = wordnet.MORPHOLOGICAL_SUBSTITUTIONS['n']
+    exceptions = getattr(wordnet, '_exception_map', {}).get('n', {})
+    return substitutions, exceptions
+
+
+def surface_candidates(term, substitutions, reversed_exceptions):
+    """
+    Formas de superfície que o lematizador pode levar ao termo: o próprio
+    termo, as regras de sufixo aplicadas ao contrário e as exceções
+    """
+    candidates = {term}
+    for inflected, base in substitutions:
+        if term.endswith(base):
+            candidates.add(term[:len(term) - len(base)] + inflected)
+    candidates.update(reversed_exceptions.get(term, ()))
+    return candidates
+
+
+class VocabularyShortcut:
+    """
+    Atalho de serviço: mapeia cada forma de superfície conhecida direto para
+    o índice do termo no vocabulário do modelo. Tokens fora do mapa não
+    alteram a previsão e são ignorados sem passar pelo WordNet, e o texto não
+    é tokenizado de novo pelo vetorizador.
+    """
+
+    def __init__(self, preprocessor, engine, surface_index, terms):
+        self.preprocessor = preprocessor
+        self.engine = engine
+        self.surface_index = surface_index
+        self.terms = terms
+
+    @classmethod
+    def from_model(cls, preprocessor, sentiment_classifier, engine):
+        """
+        Monta o mapa a partir do vocabulário do modelo; cada forma candidata
+        só entra no mapa se o pré-processamento normal a levar ao mesmo termo
+        """
+        preprocessor.load()
+        substitutions, exceptions = noun_morphology()
+
+        reversed_exceptions = {}
+        for inflected, bases in exceptions.items():
+            for base in bases:
+                reversed_exceptions.setdefault(base, []).append(inflected)
+
+        surface_index = {}
+        for term, index in sentiment_classifier.vectorizer.vocabulary_.items():
+            for candidate in surface_candidates(term, substitutions, reversed_exceptions):
+                if preprocessor.preprocess(candidate) == term:
+                    surface_index[candidate] = int(index)
+
+        terms = [str(term) for term in sentiment_classifier.feature_names]
+        return cls(preprocessor, engine, surface_index, terms)
+
+    def vectorize(self, text):
+        """
+        Retorna o vetor (índices, pesos) no formato do motor rápido e o texto
+        formado pelos termos do vocabulário encontrados
+        """
+        counts = {}
+        found = []
+        lookup = self.surface_index.get
+        for token in self.preprocessor.clean(text).split():
+            index = lookup(token)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+                found.append(index)
+
+        indices = np.array(sorted(counts), dtype=np.intp)
+        values = self.engine.weight(indices, [counts[index] for index in indices.tolist()])
+        terms = self.terms
+        return (indices, values), ' '.join([terms[index] for index in found])
+
+    def score(self, texts):
+        """
+        Retorna previsões, probabilidades, confiança e os textos processados
+        a partir dos textos originais (sem pré-processamento)
+        """
+        vectors = []
+        processed_texts = []
+        for text in texts:
+            vector, processed_text = self.vectorize(text)
+            vectors.append(vector)
+            processed_texts.append(processed_text)
+        return (*self.engine.score_vectors(vectors), processed_texts)
+
+
+def check_shortcut(shortcut, texts, atol=1e-12):
+    """
+    Compara as probabilidades do atalho com as do caminho normal
+    (pré-processamento + motor rápido) e retorna a maior diferença
+    """
+    expected = shortcut.engine.predict_proba(shortcut.preprocessor.preprocess_many(texts))
+    actual = shortcut.score(texts)[1]
+    difference = float(np.abs(expected - actual).max()) if len(texts) else 0.0
+    if difference > atol:
+        raise AssertionError(f"Probabilidades divergentes (diferença máxima {difference:.3g})")
+    return difference
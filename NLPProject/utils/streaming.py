@@ -0,0 +1,149 @@
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+from utils.preprocessing import TextPreprocessor
+from utils.training import SentimentClassifier
+import pandas as pd
+import numpy as np
+import sys
+import time
+
+
+def peak_memory_mb():
+    """
+    Pico de memória residente do processo em MB (None se indisponível)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def iter_text_chunks(path, text_column='text', label_column='sentiment', chunksize=10000):
+    """
+    Lê um CSV ou JSONL em blocos, retornando DataFrames com texto e rótulo
+    """
+    if path.endswith(('.jsonl', '.ndjson', '.json')):
+        reader = pd.read_json(path, lines=True, chunksize=chunksize)
+    else:
+        reader = pd.read_csv(path, chunksize=chunksize, usecols=[text_column, label_column])
+
+    with reader:
+        for chunk in reader:
+            chunk = chunk[[text_column, label_column]].dropna()
+            yield chunk[text_column].astype(str), chunk[label_column]
+
+
+class StreamingTrainer:
+    """
+    Treinamento fora da memória: vetorização por hashing (sem vocabulário em
+    memória) e MultinomialNB atualizado bloco a bloco com partial_fit
+    """
+
+    def __init__(self, n_features=2 ** 20, classes=(0, 1), use_idf=True, n_jobs=1,
+                 preprocessor=None):
+        self.n_features = n_features
+        self.classes = np.asarray(classes)
+        self.use_idf = use_idf
+        self.n_jobs = n_jobs
+        self.preprocessor = preprocessor or TextPreprocessor()
+
+        # Contagens brutas; a ponderação TF-IDF fica no TfidfTransformer
+        self.hashing = HashingVectorizer(n_features=n_features, alternate_sign=False,
+                                         norm=None)
+        self.tfidf = TfidfTransformer(use_idf=use_idf)
+        self.classifier = MultinomialNB()
+        self._pool = None
+
+    def _preprocess(self, texts):
+        if self.n_jobs == 1:
+            return self.preprocessor.preprocess_many(texts)
+        return self.preprocessor.preprocess_parallel(texts, n_jobs=self.n_jobs,
+                                                     executor=self._pool)
+
+    def _report(self, stage, rows, start, extra=''):
+        elapsed = time.perf_counter() - start
+        memory = peak_memory_mb()
+        memory_text = f", pico de memória {memory:.0f} MB" if memory is not None else ''
+        print(f"[{stage}] {rows} textos em {elapsed:.1f}s "
+              f"({rows / elapsed if elapsed else 0:.0f} textos/s){memory_text}{extra}")
+
+    def _fit_idf(self, processed_chunks):
+        # Primeira passada: frequência de documentos de cada coluna do hashing
+        document_frequency = np.zeros(self.n_features, dtype=np.int64)
+        n_documents = 0
+        start = time.perf_counter()
+
+        for processed, _ in processed_chunks:
+            X = self.hashing.transform(processed)
+            document_frequency += np.bincount(X.indices, minlength=self.n_features)
+            n_documents += X.shape[0]
+            self._report('idf', n_documents, start)
+
+        # Mesma fórmula do TfidfTransformer com smooth_idf=True
+        self.tfidf.idf_ = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+        self.tfidf.n_features_in_ = self.n_features
+
+    def _processed_chunks(self, chunks, cache=None, cache_path=None, metadata=None):
+        # Blocos já pré-processados: do cache em disco, se completo; senão,
+        # pré-processados agora (e gravados no cache enquanto são lidos)
+        if cache is not None and cache.is_complete(cache_path):
+            return cache.iter_shards(cache_path)
+        processed = ((self._preprocess(texts), labels) for texts, labels in chunks())
+        if cache is not None:
+            return cache.save_stream(cache_path, processed, metadata)
+        return processed
+
+    def fit(self, chunks, cache=None, cache_path=None, metadata=None):
+        """
+        Treina a partir de uma função que retorna um iterador de blocos
+        (textos, rótulos). Com use_idf=True os dados são percorridos duas
+        vezes; com um ProcessedShardCache (cache, cache_path) os textos
+        pré-processados na primeira passada são gravados em shards e relidos
+        na segunda, e reaproveitados em novas execuções. Sem cache, a segunda
+        passada pré-processa tudo de novo (o dobro do custo dominante).
+        """
+        if self.n_jobs != 1:
+            self._pool = self.preprocessor.create_pool(self.n_jobs)
+
+        try:
+            if self.use_idf:
+                self._fit_idf(self._processed_chunks(chunks, cache, cache_path, metadata))
+            else:
+                self.tfidf.n_features_in_ = self.n_features
+
+            # Segunda passada: avaliação progressiva (testar antes de treinar)
+            rows = 0
+            correct = 0
+            evaluated = 0
+            start = time.perf_counter()
+            for processed, labels in self._processed_chunks(chunks, cache, cache_path, metadata):
+                X = self.tfidf.transform(self.hashing.transform(processed))
+                labels = np.asarray(labels)
+
+                if rows:
+                    correct += int((self.classifier.predict(X) == labels).sum())
+                    evaluated += len(labels)
+                self.classifier.partial_fit(X, labels, classes=self.classes)
+                rows += len(labels)
+
+                accuracy = f", acurácia progressiva {correct / evaluated:.3f}" if evaluated else ''
+                self._report('treino', rows, start, accuracy)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+        return self
+
+    def to_sentiment_classifier(self):
+        """
+        Empacota o resultado no mesmo formato carregado pelo app
+        """
+        model = SentimentClassifier()
+        model.vectorizer = Pipeline([('hashing', self.hashing), ('tfidf', self.tfidf)])
+        model.classifier = self.classifier
+        return model
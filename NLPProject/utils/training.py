@@ -2,15 +2,33 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.metrics import classification_report, confusion_matrix
+from utils.artifacts import save_artifact, load_artifact
+from utils.metrics import STAGE_LATENCY
 import joblib
+import hashlib
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
+
+
+def model_version(*paths):
+    """
+    Calcula uma versão curta do modelo a partir do conteúdo dos artefatos
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:12]
 
 
 class SentimentClassifier:
     def __init__(self):
         self.vectorizer = TfidfVectorizer(max_features=5000)
         self.classifier = MultinomialNB()
+        self._feature_names = None
+        self.version = None
 
     def train(self, X, y):
         """
@@ -21,6 +39,37 @@ class SentimentClassifier:
 
         # Treinar o classificador
         self.classifier.fit(X_tfidf, y)
+        self._feature_names = None
+        self.version = None
+
+    def train_soft(self, X, probabilities):
+        """
+        Treina com rótulos suaves (probabilidade de cada classe, por exemplo a
+        saída de um transformer): cada texto entra uma vez por classe, com
+        peso igual à probabilidade daquela classe
+        """
+        X_tfidf = self.vectorizer.fit_transform(X)
+
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        n_texts, n_classes = probabilities.shape
+        X_repeated = sp.vstack([X_tfidf] * n_classes, format='csr')
+        y = np.repeat(np.arange(n_classes), n_texts)
+        self.classifier.fit(X_repeated, y, sample_weight=probabilities.T.ravel())
+        self._feature_names = None
+        self.version = None
+
+    @property
+    def feature_names(self):
+        """
+        Nomes dos termos do vocabulário, calculados uma única vez por modelo
+        (None para vetorizadores sem vocabulário, como o de hashing)
+        """
+        if self._feature_names is None:
+            try:
+                self._feature_names = self.vectorizer.get_feature_names_out()
+            except AttributeError:
+                return None
+        return self._feature_names
 
     def predict(self, texts):
         """
@@ -39,6 +88,20 @@ class SentimentClassifier:
         X_tfidf = self.vectorizer.transform(texts)
         return self.classifier.predict_proba(X_tfidf)
 
+    def score(self, texts):
+        """
+        Retorna previsões, probabilidades e confiança vetorizando uma única vez
+        """
+        with STAGE_LATENCY.time('vectorize'):
+            X_tfidf = self.vectorizer.transform(texts)
+        with STAGE_LATENCY.time('classify'):
+            probabilities = self.classifier.predict_proba(X_tfidf)
+
+        # O argmax das probabilidades coincide com o resultado de predict()
+        predictions = self.classifier.classes_[probabilities.argmax(axis=1)]
+        confidences = probabilities.max(axis=1)
+        return predictions, probabilities, confidences
+
     def save_model(self, vectorizer_path, classifier_path):
         """
         Salva o modelo treinado
@@ -54,4 +117,22 @@ class SentimentClassifier:
         instance = cls()
         instance.vectorizer = joblib.load(vectorizer_path)
         instance.classifier = joblib.load(classifier_path)
-        return instance
\ No newline at end of file
+        instance.version = model_version(vectorizer_path, classifier_path)
+        return instance
+
+    def save_artifact(self, path):
+        """
+        Salva o modelo no formato mapeável em memória (np.memmap)
+        """
+        return save_artifact(self.vectorizer, self.classifier, path)
+
+    @classmethod
+    def load_artifact(cls, path, verify=True):
+        """
+        Carrega um modelo salvo com save_artifact, compartilhando as páginas
+        do arquivo entre os processos que o abrirem
+        """
+        instance = cls()
+        instance.vectorizer, instance.classifier, header = load_artifact(path, verify)
+        instance.version = header['checksum'][:12]
+        return instance
@@ -0,0 +1,74 @@
+from utils.metrics import STAGE_LATENCY
+import numpy as np
+
+
+# Modelo padrão do pipeline('sentiment-analysis') do Hugging Face
+DEFAULT_TRANSFORMER = 'distilbert-base-uncased-finetuned-sst-2-english'
+
+
+class TransformerScorer:
+    """
+    Classificador transformer (Hugging Face) em CPU, com a mesma interface de
+    SentimentClassifier.score. Os textos são tokenizados uma única vez,
+    truncados por número de tokens e ordenados por tamanho antes de formar os
+    lotes, para reduzir o padding.
+    """
+
+    def __init__(self, model_name=DEFAULT_TRANSFORMER, batch_size=32, max_length=512,
+                 model=None, tokenizer=None):
+        # transformers e torch só são necessários quando o transformer é usado
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self._torch = torch
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = tokenizer or AutoTokenizer.from_pretrained(model_name)
+        self.model = model or AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+
+        # Coluna de cada classe (0 = negativo, 1 = positivo) na saída do modelo
+        labels = {index: label.upper() for index, label in self.model.config.id2label.items()}
+        positive = [index for index, label in labels.items() if label.startswith('POS')]
+        negative = [index for index, label in labels.items() if label.startswith('NEG')]
+        self.columns = [negative[0], positive[0]] if positive and negative else [0, 1]
+        self.classes_ = np.array([0, 1])
+
+    def predict_proba(self, texts):
+        """
+        Probabilidades [negativo, positivo] na ordem original dos textos
+        """
+        texts = list(texts)
+        probabilities = np.zeros((len(texts), 2))
+        if not texts:
+            return probabilities
+
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        order = np.argsort([len(ids) for ids in encodings['input_ids']], kind='stable')
+
+        torch = self._torch
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch_indices = order[start:start + self.batch_size]
+                batch = self.tokenizer.pad(
+                    {key: [encodings[key][i] for i in batch_indices] for key in encodings.keys()},
+                    return_tensors='pt'
+                )
+                output = torch.softmax(self.model(**batch).logits, dim=-1).numpy()
+                probabilities[batch_indices] = output[:, self.columns]
+
+        return probabilities
+
+    def predict(self, texts):
+        return self.score(texts)[0]
+
+    def score(self, texts):
+        """
+        Retorna previsões, probabilidades e confiança, como SentimentClassifier.score
+        """
+        with STAGE_LATENCY.time('transformer'):
+            probabilities = self.predict_proba(texts)
+        predictions = self.classes_[probabilities.argmax(axis=1)]
+        confidences = probabilities.max(axis=1)
+        return predictions, probabilities, confidences